@@ -2,17 +2,81 @@
 Функции для работы с паролями
 """
 
-from passlib.context import CryptContext
+import asyncio
+import hashlib
+import hmac
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
 
-# Контекст для хеширования паролей
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+import bcrypt
 
+from ..config import settings
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Проверка пароля"""
-    return bool(pwd_context.verify(plain_password, hashed_password))
+# Стоимость bcrypt (cost 10 вместо 12 по умолчанию)
+BCRYPT_ROUNDS = 10
 
+# Отдельный пул для bcrypt: он отпускает GIL, поэтому потоки загружают все ядра,
+# а пул по числу CPU не занимает executor по умолчанию и не перегружает процессор
+_HASH_EXECUTOR = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1, thread_name_prefix="bcrypt"
+)
 
-def get_password_hash(password: str) -> str:
-    """Хеширование пароля"""
-    return str(pwd_context.hash(password))
+# Кеш успешных проверок: bcrypt хеш -> HMAC(SECRET_KEY, пароль).
+# Открытый пароль в памяти не хранится, неудачные попытки не кешируются.
+# После смены пароля старый хеш больше не проверяется, запись вытесняется LRU.
+PASSWORD_CACHE_SIZE = 4096
+_verified_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_verified_lock = Lock()
+_HMAC_KEY = settings.SECRET_KEY.encode()
+
+
+def _password_digest(plain_password: str) -> bytes:
+    """HMAC-SHA256 пароля на ключе приложения"""
+    return hmac.new(_HMAC_KEY, plain_password.encode(), hashlib.sha256).digest()
+
+
+def _bcrypt_check(plain_password: str, hashed_password: str) -> bool:
+    """
+    Проверка пароля напрямую через bcrypt
+
+    Длина пароля (не более 72 байт в UTF-8) проверяется на уровне схем.
+    """
+    return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode())
+
+
+def _bcrypt_hash(password: str) -> str:
+    """Хеширование пароля напрямую через bcrypt"""
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode()
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Проверка пароля (bcrypt выполняется в пуле _HASH_EXECUTOR)"""
+    digest = _password_digest(plain_password)
+
+    with _verified_lock:
+        cached = _verified_cache.get(hashed_password)
+        if cached is not None and hmac.compare_digest(cached, digest):
+            _verified_cache.move_to_end(hashed_password)
+            return True
+
+    loop = asyncio.get_running_loop()
+    if not await loop.run_in_executor(
+        _HASH_EXECUTOR, _bcrypt_check, plain_password, hashed_password
+    ):
+        return False
+
+    with _verified_lock:
+        _verified_cache[hashed_password] = digest
+        _verified_cache.move_to_end(hashed_password)
+        if len(_verified_cache) > PASSWORD_CACHE_SIZE:
+            _verified_cache.popitem(last=False)
+    return True
+
+
+async def get_password_hash(password: str) -> str:
+    """Хеширование пароля (bcrypt выполняется в пуле _HASH_EXECUTOR)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_HASH_EXECUTOR, _bcrypt_hash, password)
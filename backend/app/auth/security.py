@@ -2,39 +2,46 @@
 Модуль безопасности и аутентификации
 """
 
-from datetime import datetime, timedelta
-from typing import Optional
-
-from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from jose import JWTError, jwt
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from threading import Lock
+from typing import Optional, Tuple
+
+import jwt
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..config import settings
 from ..db import get_db
 from ..models.user import User
 from ..schemas.auth import TokenData
-from ..services.user_service import UserService
 
-# HTTP Bearer схема для токенов
-security = HTTPBearer()
+# Параметры JWT фиксируются при импорте
+_SECRET_KEY = settings.SECRET_KEY
+_ALGORITHM = settings.ALGORITHM
+_ALGORITHMS = [_ALGORITHM]
+_EXPIRE_SECONDS = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+# Кеш декодированных токенов: blake2b(токен) -> (данные, время истечения).
+# Токен неизменяем до exp, поэтому повторная проверка подписи не нужна.
+TOKEN_CACHE_SIZE = 16384
+_token_cache: "OrderedDict[bytes, Tuple[TokenData, float]]" = OrderedDict()
+_token_lock = Lock()
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Создание JWT токена"""
     to_encode = data.copy()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = int(time.time() + expires_delta.total_seconds())
     else:
-        expire = datetime.utcnow() + timedelta(
-            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-        )
+        expire = int(time.time()) + _EXPIRE_SECONDS
 
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(
-        to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
-    )
-    return str(encoded_jwt)
+    to_encode["exp"] = expire
+    return jwt.encode(to_encode, _SECRET_KEY, algorithm=_ALGORITHM)
 
 
 async def verify_token(token: str) -> TokenData:
@@ -45,9 +52,21 @@ async def verify_token(token: str) -> TokenData:
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+    cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    with _token_lock:
+        cached = _token_cache.get(cache_key)
+        if cached is not None:
+            if time.time() < cached[1]:
+                _token_cache.move_to_end(cache_key)
+                return cached[0]
+            del _token_cache[cache_key]
+
     try:
         payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+            token,
+            _SECRET_KEY,
+            algorithms=_ALGORITHMS,
+            options={"require": ["exp", "sub", "user_id"]},
         )
         username: str = payload.get("sub")  # type: ignore
         user_id: int = payload.get("user_id")  # type: ignore
@@ -56,41 +75,64 @@ async def verify_token(token: str) -> TokenData:
             raise credentials_exception
 
         token_data = TokenData(username=username, user_id=user_id)
-        return token_data
-    except JWTError:
+    except jwt.PyJWTError:
         raise credentials_exception
 
+    expire = payload.get("exp")
+    if expire is not None:
+        with _token_lock:
+            _token_cache[cache_key] = (token_data, float(expire))
+            if len(_token_cache) > TOKEN_CACHE_SIZE:
+                _token_cache.popitem(last=False)
+    return token_data
+
+
+class BearerToken(HTTPBearer):
+    """
+    Bearer схема для OpenAPI (кнопка Authorize в /docs) с быстрым разбором
+
+    Возвращает сам токен: без модели HTTPAuthorizationCredentials на запрос.
+    """
+
+    async def __call__(self, request: Request) -> str:  # type: ignore[override]
+        """Извлечение Bearer токена из заголовка Authorization"""
+        authorization = request.headers.get("authorization", "")
+        if authorization[:7].lower() != "bearer " or not authorization[7:]:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Not authenticated",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return authorization[7:]
+
+
+# Имя схемы как у прежнего HTTPBearer()
+bearer_token = BearerToken(scheme_name="HTTPBearer")
+
 
 async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
+    token: str = Depends(bearer_token),
     db: AsyncSession = Depends(get_db),
 ) -> User:
-    """Получение текущего пользователя из токена"""
-    token = credentials.credentials
+    """Получение текущего активного пользователя из токена"""
     token_data = await verify_token(token)
 
-    if token_data.username is None:
+    if token_data.user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
         )
 
-    user_service = UserService(db)
-    user = await user_service.get_by_username(token_data.username)
+    # Поиск по первичному ключу (identity map сессии, затем PK индекс)
+    user = await db.get(User, token_data.user_id)
 
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
         )
 
-    return user
-
-
-async def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
-    """Получение активного пользователя"""
-    if not current_user.is_active:
+    if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user"
         )
-    return current_user
+
+    return user
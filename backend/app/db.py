@@ -2,7 +2,7 @@
 Настройка базы данных
 """
 
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Dict
 
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
@@ -20,8 +20,35 @@ class Base(DeclarativeBase):
     pass
 
 
+def _engine_options(url: str) -> Dict[str, Any]:
+    """Параметры пула и драйвера для движка"""
+    options: Dict[str, Any] = {}
+    if url.startswith("postgresql+asyncpg"):
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_pre_ping=True,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            # LIFO: лишние соединения простаивают и закрываются по pool_recycle
+            pool_use_lifo=True,
+            connect_args={
+                "command_timeout": settings.DB_COMMAND_TIMEOUT,
+                "server_settings": {"jit": "off"},
+                "statement_cache_size": 1024,
+                "prepared_statement_cache_size": 512,
+            },
+        )
+    return options
+
+
 # Создание асинхронного движка
-engine = create_async_engine(settings.DATABASE_URL, echo=settings.DEBUG, future=True)
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=settings.SQL_ECHO,
+    future=True,
+    **_engine_options(settings.DATABASE_URL),
+)
 
 # Создание фабрики сессий
 AsyncSessionLocal = async_sessionmaker(
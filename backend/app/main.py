@@ -2,15 +2,26 @@
 Main FastAPI application file
 """
 
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
 
 from .config import settings
 from .routes import auth, ml, tasks, users
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Startup/shutdown hooks"""
+    # Build the OpenAPI schema once at startup; FastAPI caches it on the app,
+    # so /openapi.json and /docs never pay the generation cost per request
+    app.openapi()
+    yield
+
+
 def create_application() -> FastAPI:
     """Create and configure FastAPI application"""
 
@@ -21,28 +32,21 @@ def create_application() -> FastAPI:
         openapi_url=f"{settings.API_V1_STR}/openapi.json",
         docs_url="/docs",
         redoc_url="/redoc",
+        lifespan=lifespan,
     )
 
     # CORS settings
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=settings.ALLOWED_HOSTS,
+        allow_origins=tuple(settings.ALLOWED_HOSTS),
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
     )
 
     # Include routers
-    app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
-    app.include_router(
-        users.router, prefix=f"{settings.API_V1_STR}/users", tags=["users"]
-    )
-    app.include_router(
-        tasks.router, prefix=f"{settings.API_V1_STR}/tasks", tags=["tasks"]
-    )
-    app.include_router(
-        ml.router, prefix=f"{settings.API_V1_STR}/ml", tags=["machine-learning"]
-    )
+    for router in (auth.router, users.router, tasks.router, ml.router):
+        app.include_router(router, prefix=settings.API_V1_STR)
 
     return app
 
@@ -52,27 +56,27 @@ app = create_application()
 
 
 @app.get("/")
-async def root() -> JSONResponse:
+async def root() -> Dict[str, str]:
     """Root endpoint"""
-    return JSONResponse(
-        content={
-            "message": "ML-Backend Playground API",
-            "version": settings.VERSION,
-            "docs": "/docs",
-            "redoc": "/redoc",
-        }
-    )
+    return {
+        "message": "ML-Backend Playground API",
+        "version": settings.VERSION,
+        "docs": "/docs",
+        "redoc": "/redoc",
+    }
 
 
 @app.get("/health")
-async def health_check() -> JSONResponse:
+async def health_check() -> Dict[str, str]:
     """Health check endpoint"""
-    return JSONResponse(
-        content={"status": "healthy", "environment": settings.ENVIRONMENT}
-    )
+    return {"status": "healthy", "environment": settings.ENVIRONMENT}
 
 
 if __name__ == "__main__":
     uvicorn.run(
-        "main:app", host="0.0.0.0", port=8000, reload=settings.DEBUG, log_level="info"
+        "backend.app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=settings.DEBUG,
+        log_level="info",
     )
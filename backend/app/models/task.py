@@ -2,12 +2,20 @@
 Модель задачи
 """
 
-from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import Boolean, Column, DateTime
-from sqlalchemy import Enum as SQLEnum
-from sqlalchemy import ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    Boolean,
+    CheckConstraint,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+)
 from sqlalchemy.orm import relationship
 
 from ..db import Base
@@ -31,20 +39,39 @@ class TaskPriority(str, Enum):
     URGENT = "urgent"
 
 
+def _in_values(column: str, enum: type[Enum]) -> str:
+    """SQL-условие CHECK для допустимых значений перечисления"""
+    values = ", ".join(f"'{member.value}'" for member in enum)
+    return f"{column} IN ({values})"
+
+
 class Task(Base):
     """Модель задачи"""
 
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Список задач пользователя: фильтр по владельцу (и статусу),
+        # сортировка по (created_at, id) обратным проходом по индексу
+        Index("ix_tasks_owner_created", "owner_id", "created_at", "id"),
+        Index(
+            "ix_tasks_owner_status_created", "owner_id", "status", "created_at", "id"
+        ),
+        CheckConstraint(_in_values("status", TaskStatus), name="ck_tasks_status"),
+        CheckConstraint(_in_values("priority", TaskPriority), name="ck_tasks_priority"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
     is_completed = Column(Boolean, default=False)
-    status: "Column[TaskStatus]" = Column(SQLEnum(TaskStatus), default=TaskStatus.PENDING)
-    priority: "Column[TaskPriority]" = Column(SQLEnum(TaskPriority), default=TaskPriority.MEDIUM)
+    status = Column(String(16), default=TaskStatus.PENDING.value)
+    priority = Column(String(16), default=TaskPriority.MEDIUM.value)
     due_date = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
 
     # Связи
     owner_id = Column(Integer, ForeignKey("users.id"))
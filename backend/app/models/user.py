@@ -2,9 +2,7 @@
 Модель пользователя
 """
 
-from datetime import datetime
-
-from sqlalchemy import Boolean, Column, DateTime, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, Integer, String, func
 from sqlalchemy.orm import relationship
 
 from ..db import Base
@@ -22,11 +20,14 @@ class User(Base):
     full_name = Column(String, nullable=True)
     is_active = Column(Boolean, default=True)
     is_superuser = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-
-    # Связи
-    tasks = relationship("Task", back_populates="owner")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    # Связи (ленивая загрузка запрещена: в async она блокирует event loop,
+    # задачи нужно загружать явно через selectinload)
+    tasks = relationship("Task", back_populates="owner", lazy="raise")
 
     def __repr__(self) -> str:
         return f"<User(id={self.id}, username='{self.username}')>"
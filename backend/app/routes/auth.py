@@ -15,7 +15,7 @@ from ..schemas.auth import Token
 from ..schemas.user import UserCreate, UserResponse
 from ..services.user_service import UserService
 
-router = APIRouter()
+router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/register", response_model=UserResponse)
@@ -26,15 +26,14 @@ async def register(
     user_service = UserService(db)
 
     # Check if user already exists
-    existing_user = await user_service.get_by_email(user_data.email)
-    if existing_user:
+    taken = await user_service.get_taken_fields(user_data.email, user_data.username)
+    if "email" in taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User with this email already exists",
         )
 
-    existing_user = await user_service.get_by_username(user_data.username)
-    if existing_user:
+    if "username" in taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User with this username already exists",
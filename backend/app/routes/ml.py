@@ -2,10 +2,10 @@
 Роуты для ML функциональности
 """
 
-import io
 from typing import Any, Dict
 
-import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from fastapi import (
     APIRouter,
     Depends,
@@ -14,16 +14,35 @@ from fastapi import (
     UploadFile,
     status,
 )
+from pyarrow import csv as pacsv
 
-from ..auth.security import get_current_active_user
+from ..auth.security import get_current_user
 from ..models.user import User
 
-router = APIRouter()
+router = APIRouter(prefix="/ml", tags=["machine-learning"])
+
+# Размер блока многопоточного CSV-парсера pyarrow (байт)
+CSV_BLOCK_SIZE = 1 << 20
+
+
+def _numeric_stats(table: pa.Table) -> Dict[str, Dict[str, Any]]:
+    """Среднее, минимум и максимум числовых столбцов (ядра pyarrow.compute)"""
+    stats: Dict[str, Dict[str, Any]] = {}
+    for name, column in zip(table.column_names, table.columns):
+        if not (pa.types.is_integer(column.type) or pa.types.is_floating(column.type)):
+            continue
+        min_max = pc.min_max(column)
+        stats[name] = {
+            "mean": pc.mean(column).as_py(),
+            "min": min_max["min"].as_py(),
+            "max": min_max["max"].as_py(),
+        }
+    return stats
 
 
 @router.get("/")
 async def ml_info(
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_user),
 ) -> Dict[str, Any]:
     """Information about available ML algorithms"""
     return {
@@ -60,7 +79,7 @@ async def ml_info(
 
 @router.post("/upload-data")
 async def upload_data(
-    file: UploadFile = File(...), current_user: User = Depends(get_current_active_user)
+    file: UploadFile = File(...), current_user: User = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """Загрузка данных для ML обработки"""
 
@@ -71,15 +90,21 @@ async def upload_data(
         )
 
     try:
-        contents = await file.read()
-        df = pd.read_csv(io.StringIO(contents.decode("utf-8")))
+        # pyarrow читает загруженный файл напрямую в колоночную таблицу
+        table = pacsv.read_csv(
+            file.file, read_options=pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE)
+        )
 
         return {
             "filename": file.filename,
-            "shape": df.shape,
-            "columns": df.columns.tolist(),
-            "dtypes": df.dtypes.to_dict(),
-            "preview": df.head().to_dict("records"),
+            "shape": (table.num_rows, table.num_columns),
+            "columns": table.column_names,
+            "dtypes": {
+                name: str(dtype)
+                for name, dtype in zip(table.column_names, table.schema.types)
+            },
+            "preview": table.slice(0, 5).to_pylist(),
+            "stats": _numeric_stats(table),
             "message": "Данные успешно загружены и проанализированы",
         }
 
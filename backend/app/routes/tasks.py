@@ -2,25 +2,30 @@
 Роуты для работы с задачами
 """
 
-from typing import Any, List, Optional
+from typing import Any, AsyncIterator, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..auth.security import get_current_active_user
+from ..auth.security import get_current_user
 from ..db import get_db
 from ..models.task import TaskStatus
 from ..models.user import User
 from ..schemas.task import TaskCreate, TaskResponse, TaskUpdate
 from ..services.task_service import TaskService
 
-router = APIRouter()
+router = APIRouter(prefix="/tasks", tags=["tasks"])
+
+# Пакетная валидация списка задач за один вызов pydantic-core
+_tasks_adapter = TypeAdapter(List[TaskResponse])
 
 
 @router.post("/", response_model=TaskResponse)
 async def create_task(
     task_data: TaskCreate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> TaskResponse:
     """Создание новой задачи"""
@@ -33,21 +38,57 @@ async def create_task(
 async def read_tasks(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    status: Optional[TaskStatus] = Query(None, description="Фильтр по статусу"),
-    current_user: User = Depends(get_current_active_user),
+    task_status: Optional[TaskStatus] = Query(
+        None, alias="status", description="Фильтр по статусу"
+    ),
+    before_id: Optional[int] = Query(
+        None, ge=1, description="Курсор: id последней задачи предыдущей страницы"
+    ),
+    current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> List[TaskResponse]:
     """Получение списка задач текущего пользователя"""
     task_service = TaskService(db)
     tasks = await task_service.get_tasks(
-        owner_id=int(current_user.id), status=status, skip=skip, limit=limit
+        owner_id=int(current_user.id),
+        status=task_status,
+        skip=skip,
+        limit=limit,
+        before_id=before_id,
     )
-    return [TaskResponse.model_validate(task) for task in tasks]
+
+    # Пустая страница по курсору: проверяем, что курсор - задача пользователя
+    # (дополнительный запрос только в этом случае)
+    if not tasks and before_id is not None:
+        if await task_service.get_task(before_id, int(current_user.id)) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Задача не найдена"
+            )
+
+    return _tasks_adapter.validate_python(tasks, from_attributes=True)
+
+
+@router.get("/export")
+async def export_tasks(
+    status: Optional[TaskStatus] = Query(None, description="Фильтр по статусу"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> StreamingResponse:
+    """Выгрузка всех задач текущего пользователя в формате NDJSON"""
+    task_service = TaskService(db)
+    owner_id = int(current_user.id)
+
+    async def lines() -> AsyncIterator[bytes]:
+        async for rows in task_service.stream_tasks(owner_id, status=status):
+            tasks = _tasks_adapter.validate_python(rows, from_attributes=True)
+            yield b"".join(task.model_dump_json().encode() + b"\n" for task in tasks)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 
 @router.get("/stats")
 async def get_task_stats(
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> dict[str, Any]:
     """Получение статистики задач пользователя"""
@@ -59,7 +100,7 @@ async def get_task_stats(
 @router.get("/{task_id}", response_model=TaskResponse)
 async def read_task(
     task_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> TaskResponse:
     """Получение задачи по ID"""
@@ -78,7 +119,7 @@ async def read_task(
 async def update_task(
     task_id: int,
     task_update: TaskUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> TaskResponse:
     """Обновление задачи"""
@@ -96,7 +137,7 @@ async def update_task(
 @router.delete("/{task_id}")
 async def delete_task(
     task_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> dict:
     """Удаление задачи"""
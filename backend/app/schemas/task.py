@@ -3,7 +3,7 @@ Pydantic схемы для задач
 """
 
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from pydantic import BaseModel, Field
 
@@ -23,7 +23,11 @@ class TaskBase(BaseModel):
 class TaskCreate(TaskBase):
     """Схема для создания задачи"""
 
-    pass
+    class Config:
+        # Статус и приоритет (включая значения по умолчанию) хранятся строками,
+        # как в БД
+        use_enum_values = True
+        validate_default = True
 
 
 class TaskUpdate(BaseModel):
@@ -36,6 +40,11 @@ class TaskUpdate(BaseModel):
     due_date: Optional[datetime] = None
     is_completed: Optional[bool] = None
 
+    def to_update_dict(self) -> Dict[str, Any]:
+        """Явно переданные поля (аналог model_dump(exclude_unset=True))"""
+        values = self.__dict__
+        return {name: values[name] for name in self.__pydantic_fields_set__}
+
 
 class TaskInDB(TaskBase):
     """Схема задачи в базе данных"""
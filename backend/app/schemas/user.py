@@ -2,16 +2,39 @@
 Pydantic схемы для пользователей
 """
 
+import re
 from datetime import datetime
-from typing import Optional
+from typing import Annotated, Any, Dict, Optional
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, StringConstraints, field_validator
+
+# Email из БД уже проверен при регистрации: для ответов хватает простого шаблона,
+# полная проверка EmailStr (email-validator, IDNA) нужна только для ввода
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+StoredEmail = Annotated[str, StringConstraints(pattern=EMAIL_RE.pattern)]
+
+# bcrypt учитывает только первые 72 байта пароля в UTF-8
+PASSWORD_MAX_BYTES = 72
+
+
+def check_password_bytes(password: Optional[str]) -> Optional[str]:
+    """Проверка, что пароль укладывается в лимит bcrypt"""
+    # Символ UTF-8 занимает не более 4 байт: короткие пароли не кодируем
+    if (
+        password is not None
+        and len(password) > PASSWORD_MAX_BYTES // 4
+        and len(password.encode("utf-8")) > PASSWORD_MAX_BYTES
+    ):
+        raise ValueError(
+            f"Пароль не должен превышать {PASSWORD_MAX_BYTES} байт в UTF-8"
+        )
+    return password
 
 
 class UserBase(BaseModel):
     """Базовая схема пользователя"""
 
-    email: EmailStr
+    email: StoredEmail
     username: str = Field(..., min_length=3, max_length=50)
     full_name: Optional[str] = Field(None, max_length=100)
     is_active: bool = True
@@ -20,8 +43,11 @@ class UserBase(BaseModel):
 class UserCreate(UserBase):
     """Схема для создания пользователя"""
 
+    email: EmailStr
     password: str = Field(..., min_length=8, max_length=100)
 
+    _check_password = field_validator("password")(check_password_bytes)
+
 
 class UserUpdate(BaseModel):
     """Схема для обновления пользователя"""
@@ -32,6 +58,13 @@ class UserUpdate(BaseModel):
     is_active: Optional[bool] = None
     password: Optional[str] = Field(None, min_length=8, max_length=100)
 
+    _check_password = field_validator("password")(check_password_bytes)
+
+    def to_update_dict(self) -> Dict[str, Any]:
+        """Явно переданные поля (аналог model_dump(exclude_unset=True))"""
+        values = self.__dict__
+        return {name: values[name] for name in self.__pydantic_fields_set__}
+
 
 class UserInDB(UserBase):
     """Схема пользователя в базе данных"""
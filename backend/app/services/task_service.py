@@ -2,15 +2,30 @@
 Сервис для работы с задачами
 """
 
-from datetime import datetime
-from typing import List, Optional
-
-from sqlalchemy import and_, select
+from enum import Enum
+from typing import Any, AsyncIterator, List, Optional, Sequence
+
+from sqlalchemy import (
+    ColumnElement,
+    Result,
+    Row,
+    and_,
+    delete,
+    desc,
+    func,
+    insert,
+    or_,
+    select,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models.task import Task, TaskStatus
 from ..schemas.task import TaskCreate, TaskUpdate
 
+# Строковое значение статуса: TaskStatus - str Enum, сравнение с ним работает
+_COMPLETED = TaskStatus.COMPLETED.value
+
 
 class TaskService:
     """Сервис для работы с задачами"""
@@ -19,33 +34,24 @@ class TaskService:
         self.db = db
 
     async def create_task(self, task_data: TaskCreate, owner_id: int) -> Task:
-        """Создание новой задачи"""
-        db_task = Task(
-            title=task_data.title,
-            description=task_data.description,
-            status=task_data.status,
-            priority=task_data.priority,
-            due_date=task_data.due_date,
-            owner_id=owner_id,
+        """Создание новой задачи (INSERT ... RETURNING без повторного SELECT)"""
+        values = task_data.model_dump()
+        result = await self.db.execute(
+            insert(Task).values(**values, owner_id=owner_id).returning(Task)
         )
-
-        self.db.add(db_task)
+        db_task = result.scalar_one()
         await self.db.commit()
-        await self.db.refresh(db_task)
         return db_task
 
     async def get_task(
         self, task_id: int, owner_id: Optional[int] = None
     ) -> Optional[Task]:
-        """Получение задачи по ID"""
-        query = select(Task).where(Task.id == task_id)
+        """Получение задачи по ID (через identity map сессии)"""
+        task = await self.db.get(Task, task_id)
 
-        if owner_id is not None:
-            query = query.where(Task.owner_id == owner_id)
-
-        result = await self.db.execute(query)
-        task = result.scalar_one_or_none()
-        return task if task is not None else None
+        if task is None or (owner_id is not None and task.owner_id != owner_id):
+            return None
+        return task
 
     async def get_tasks(
         self,
@@ -53,85 +59,128 @@ class TaskService:
         status: Optional[TaskStatus] = None,
         skip: int = 0,
         limit: int = 100,
-    ) -> List[Task]:
-        """Получение списка задач с фильтрацией"""
-        query = select(Task)
-
-        conditions = []
+        before_id: Optional[int] = None,
+    ) -> List[Row[Any]]:
+        """
+        Получение списка задач с фильтрацией
+
+        Возвращает строки таблицы (Row) вместо ORM объектов: список только
+        читается, поэтому identity map и состояние экземпляров не нужны.
+        before_id - курсор (id последней полученной задачи): следующая страница
+        читается по индексу без OFFSET. Курсор ищется среди задач owner_id;
+        для чужого или удаленного id результат пустой.
+        """
+        query = select(Task.__table__)
+
+        conditions: List[ColumnElement[bool]] = []
         if owner_id is not None:
             conditions.append(Task.owner_id == owner_id)
         if status is not None:
-            conditions.append(Task.status == status)
+            conditions.append(Task.status == status.value)
+        if before_id is not None:
+            columns = Task.__table__.c
+            anchor_query = select(columns.created_at).where(columns.id == before_id)
+            if owner_id is not None:
+                anchor_query = anchor_query.where(columns.owner_id == owner_id)
+            anchor = anchor_query.scalar_subquery()
+            conditions.append(
+                or_(
+                    columns.created_at < anchor,
+                    and_(columns.created_at == anchor, columns.id < before_id),
+                )
+            )
         if conditions:
             query = query.where(and_(*conditions))
 
-        query = query.offset(skip).limit(limit)
+        query = (
+            query.order_by(desc(Task.created_at), desc(Task.id))
+            .offset(skip)
+            .limit(limit)
+        )
 
         result = await self.db.execute(query)
-        return list(result.scalars().all())
+        return list(result.all())
+
+    async def stream_tasks(
+        self,
+        owner_id: int,
+        status: Optional[TaskStatus] = None,
+        chunk_size: int = 200,
+    ) -> AsyncIterator[Sequence[Row[Any]]]:
+        """
+        Потоковое чтение всех задач владельца порциями по chunk_size строк
+
+        Строки читаются через серверный курсор, в памяти держится одна порция.
+        """
+        query = select(Task.__table__).where(Task.owner_id == owner_id)
+        if status is not None:
+            query = query.where(Task.status == status.value)
+        query = query.order_by(desc(Task.created_at), desc(Task.id))
+
+        result = await self.db.stream(query)
+        async for rows in result.partitions(chunk_size):
+            yield rows
 
     async def update_task(
         self, task_id: int, task_data: TaskUpdate, owner_id: Optional[int] = None
     ) -> Optional[Task]:
-        """Обновление задачи"""
-        query = select(Task).where(Task.id == task_id)
+        """Обновление задачи одним UPDATE ... RETURNING"""
+        update_data = task_data.to_update_dict()
+        if not update_data:
+            return await self.get_task(task_id, owner_id)
 
+        # Обновление времени завершения при изменении статуса на завершено
+        if "is_completed" in update_data and update_data["is_completed"]:
+            update_data["completed_at"] = func.now()
+            update_data["status"] = _COMPLETED
+        elif "status" in update_data and update_data["status"] == _COMPLETED:
+            update_data["is_completed"] = True
+            update_data["completed_at"] = func.now()
+
+        # Статус и приоритет хранятся в БД как строки
+        for field in ("status", "priority"):
+            if isinstance(update_data.get(field), Enum):
+                update_data[field] = update_data[field].value
+
+        query = (
+            update(Task)
+            .where(Task.id == task_id)
+            .values(**update_data)
+            .returning(Task)
+            .execution_options(populate_existing=True)
+        )
         if owner_id is not None:
             query = query.where(Task.owner_id == owner_id)
 
         result = await self.db.execute(query)
         db_task = result.scalar_one_or_none()
-
-        if db_task is None:
-            return None
-
-        update_data = task_data.model_dump(exclude_unset=True)
-
-        # Обновление времени завершения при изменении статуса на завершено
-        if "is_completed" in update_data and update_data["is_completed"]:
-            update_data["completed_at"] = datetime.utcnow()
-            update_data["status"] = TaskStatus.COMPLETED
-        elif "status" in update_data and update_data["status"] == TaskStatus.COMPLETED:
-            update_data["is_completed"] = True
-            update_data["completed_at"] = datetime.utcnow()
-
-        for field, value in update_data.items():
-            setattr(db_task, field, value)
-
         await self.db.commit()
-        await self.db.refresh(db_task)
-        return db_task if db_task is not None else None
+        return db_task
 
     async def delete_task(self, task_id: int, owner_id: Optional[int] = None) -> bool:
-        """Удаление задачи"""
-        query = select(Task).where(Task.id == task_id)
+        """Удаление задачи одним DELETE ... RETURNING"""
+        query = delete(Task).where(Task.id == task_id)
 
         if owner_id is not None:
             query = query.where(Task.owner_id == owner_id)
 
-        result = await self.db.execute(query)
-        db_task = result.scalar_one_or_none()
-
-        if not db_task:
-            return False
-
-        await self.db.delete(db_task)
+        result: Result[Any] = await self.db.execute(query.returning(Task.id))
+        deleted = result.first() is not None
         await self.db.commit()
-        return True
+        return deleted
 
     async def get_user_tasks_count(self, owner_id: int) -> dict:
         """Получение статистики задач пользователя"""
-        all_tasks = await self.get_tasks(owner_id=owner_id, limit=1000)
-
-        stats = {
-            "total": len(all_tasks),
-            "pending": 0,
-            "in_progress": 0,
-            "completed": 0,
-            "cancelled": 0,
-        }
-
-        for task in all_tasks:
-            stats[task.status.value] += 1
+        result: Result[Any] = await self.db.execute(
+            select(Task.status, func.count(Task.id))
+            .where(Task.owner_id == owner_id)
+            .group_by(Task.status)
+        )
+
+        stats = {"total": 0, **{task_status.value: 0 for task_status in TaskStatus}}
+        for task_status, count in result.all():
+            stats["total"] += count
+            if task_status is not None:
+                stats[task_status] = count
 
         return stats
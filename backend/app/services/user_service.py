@@ -2,15 +2,16 @@
 Сервис для работы с пользователями
 """
 
-from typing import List, Optional
+from typing import Any, List, Optional, Set
 
-from sqlalchemy import select
+from sqlalchemy import Result, delete, insert, or_, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..auth.password import get_password_hash, verify_password
+from ..models.task import Task
 from ..models.user import User
-from ..schemas.user import UserCreate, UserUpdate
+from ..schemas.user import UserCreate, UserUpdate, check_password_bytes
 
 
 class UserService:
@@ -20,31 +21,33 @@ class UserService:
         self.db = db
 
     async def create_user(self, user_data: UserCreate) -> User:
-        """Создание нового пользователя"""
-        hashed_password = get_password_hash(user_data.password)
-
-        db_user = User(
-            email=user_data.email,
-            username=user_data.username,
-            full_name=user_data.full_name,
-            hashed_password=hashed_password,
-            is_active=user_data.is_active,
+        """Создание нового пользователя (INSERT ... RETURNING без повторного SELECT)"""
+        hashed_password = await get_password_hash(user_data.password)
+
+        query = (
+            insert(User)
+            .values(
+                email=user_data.email,
+                username=user_data.username,
+                full_name=user_data.full_name,
+                hashed_password=hashed_password,
+                is_active=user_data.is_active,
+            )
+            .returning(User)
         )
 
         try:
-            self.db.add(db_user)
+            result = await self.db.execute(query)
+            db_user = result.scalar_one()
             await self.db.commit()
-            await self.db.refresh(db_user)
             return db_user
         except IntegrityError:
             await self.db.rollback()
             raise ValueError("Пользователь с таким email или username уже существует")
 
     async def get_user(self, user_id: int) -> Optional[User]:
-        """Получение пользователя по ID"""
-        result = await self.db.execute(select(User).where(User.id == user_id))
-        user = result.scalar_one_or_none()
-        return user if user is not None else None
+        """Получение пользователя по ID (через identity map сессии)"""
+        return await self.db.get(User, user_id)
 
     async def get_by_email(self, email: str) -> Optional[User]:
         """Получение пользователя по email"""
@@ -55,8 +58,23 @@ class UserService:
     async def get_by_username(self, username: str) -> Optional[User]:
         """Получение пользователя по username"""
         result = await self.db.execute(select(User).where(User.username == username))
-        user = result.scalar_one_or_none()
-        return user if user is not None else None
+        return result.scalar_one_or_none()
+
+    async def get_taken_fields(self, email: str, username: str) -> Set[str]:
+        """Какие из email/username уже заняты (один запрос без ORM объектов)"""
+        result: Result[Any] = await self.db.execute(
+            select(User.email, User.username)
+            .where(or_(User.email == email, User.username == username))
+            .limit(2)
+        )
+
+        taken: Set[str] = set()
+        for row_email, row_username in result.all():
+            if row_email == email:
+                taken.add("email")
+            if row_username == username:
+                taken.add("username")
+        return taken
 
     async def get_users(self, skip: int = 0, limit: int = 100) -> List[User]:
         """Получение списка пользователей"""
@@ -64,52 +82,62 @@ class UserService:
         return list(result.scalars().all())
 
     async def update_user(self, user_id: int, user_data: UserUpdate) -> Optional[User]:
-        """Обновление данных пользователя"""
-        result = await self.db.execute(select(User).where(User.id == user_id))
-        db_user = result.scalar_one_or_none()
-
-        if db_user is None:
-            return None
-
-        update_data = user_data.model_dump(exclude_unset=True)
+        """Обновление данных пользователя одним UPDATE ... RETURNING"""
+        update_data = user_data.to_update_dict()
+        if not update_data:
+            return await self.get_user(user_id)
 
         # Хеширование нового пароля если он передан
         if "password" in update_data:
-            update_data["hashed_password"] = get_password_hash(
+            update_data["hashed_password"] = await get_password_hash(
                 update_data.pop("password")
             )
 
-        for field, value in update_data.items():
-            setattr(db_user, field, value)
+        query = (
+            update(User)
+            .where(User.id == user_id)
+            .values(**update_data)
+            .returning(User)
+            .execution_options(populate_existing=True)
+        )
 
         try:
+            result = await self.db.execute(query)
+            db_user = result.scalar_one_or_none()
             await self.db.commit()
-            await self.db.refresh(db_user)
-            return db_user if db_user is not None else None
+            return db_user
         except IntegrityError:
             await self.db.rollback()
             raise ValueError("Данные пользователя уже используются")
 
     async def delete_user(self, user_id: int) -> bool:
-        """Удаление пользователя"""
-        result = await self.db.execute(select(User).where(User.id == user_id))
-        db_user = result.scalar_one_or_none()
-
-        if not db_user:
-            return False
-
-        await self.db.delete(db_user)
+        """Удаление пользователя без загрузки строк (DELETE ... RETURNING)"""
+        # Задачи остаются без владельца, как при удалении через ORM
+        await self.db.execute(
+            update(Task).where(Task.owner_id == user_id).values(owner_id=None)
+        )
+        result: Result[Any] = await self.db.execute(
+            delete(User).where(User.id == user_id).returning(User.id)
+        )
+        deleted = result.first() is not None
         await self.db.commit()
-        return True
+        return deleted
 
     async def authenticate_user(self, username: str, password: str) -> Optional[User]:
         """Аутентификация пользователя"""
+        # bcrypt учитывает только первые 72 байта: более длинный пароль совпал бы
+        # с любым, у которого те же первые 72 байта
+        try:
+            check_password_bytes(password)
+        except ValueError:
+            return None
+
         user = await self.get_by_username(username)
 
         if not user:
             return None
 
-        if not verify_password(password, str(user.hashed_password)):
+        if not await verify_password(password, str(user.hashed_password)):
             return None
 
         return user
@@ -3,13 +3,31 @@
 """
 
 import argparse
-from typing import Optional, Union
+from typing import List, Optional, Union
 
 import numpy as np
 
+# Число элементов (образцы * признаки) в блоке векторного поиска разделения
+SPLIT_BLOCK_SIZE = 1 << 16
+
+# Узел обученного дерева в плоском массиве, корень - узел 0.
+# У листа feature = -1, value - индекс класса в classes_.
+# Порог хранится в float64: округление до float32 сместило бы разделения.
+NODE_DTYPE = np.dtype(
+    [
+        ("feature", np.int32),
+        ("threshold", np.float64),
+        ("left", np.int32),
+        ("right", np.int32),
+        ("value", np.int32),
+    ]
+)
+
 
 class Node:
-    """Узел дерева решений"""
+    """Узел дерева решений (представление nodes_ в виде объектов)"""
+
+    __slots__ = ("feature", "threshold", "left", "right", "value")
 
     def __init__(
         self,
@@ -26,6 +44,43 @@ class Node:
         self.value = value  # Значение для листового узла
 
 
+class FeatureBinner:
+    """
+    Квантильное разбиение признаков на не более чем max_bins корзин
+
+    Корзина b содержит значения edges[b - 1] < x <= edges[b], поэтому условие
+    "корзина <= t" эквивалентно x <= edges[t].
+    """
+
+    def __init__(self, max_bins: int = 256):
+        if not 2 <= max_bins <= 256:
+            raise ValueError("max_bins должен быть от 2 до 256")
+        self.max_bins = max_bins
+        self.bin_edges_: List[np.ndarray] = []
+
+    def fit(self, X: np.ndarray) -> "FeatureBinner":
+        """Вычисление границ корзин для каждого признака"""
+        self.bin_edges_ = []
+        for column in X.T:
+            values = np.unique(column)
+            if len(values) <= self.max_bins:
+                # Каждое значение в своей корзине, границы - середины между ними
+                edges = (values[:-1] + values[1:]) / 2
+                edges = np.where(edges >= values[1:], values[:-1], edges)
+            else:
+                quantiles = np.linspace(0, 1, self.max_bins + 1)[1:-1]
+                edges = np.unique(np.quantile(column, quantiles))
+            self.bin_edges_.append(edges)
+        return self
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        """Индексы корзин, shape (n_samples, n_features), dtype uint8"""
+        X_binned = np.empty(X.shape, dtype=np.uint8)
+        for feature, edges in enumerate(self.bin_edges_):
+            X_binned[:, feature] = np.searchsorted(edges, X[:, feature], side="left")
+        return X_binned
+
+
 class DecisionTree:
     """
     Реализация дерева решений для классификации
@@ -37,6 +92,8 @@ class DecisionTree:
         min_samples_split: int = 2,
         min_samples_leaf: int = 1,
         random_state: Optional[int] = None,
+        criterion: str = "gini",
+        max_bins: Optional[int] = None,
     ):
         """
         Инициализация дерева решений
@@ -46,82 +103,319 @@ class DecisionTree:
             min_samples_split: Минимальное количество образцов для разделения
             min_samples_leaf: Минимальное количество образцов в листе
             random_state: Зерно случайности
+            criterion: Критерий разделения: "gini" или "entropy"
+            max_bins: Число корзин для приближенного поиска разделений по
+                гистограммам (до 256); None - точный поиск по всем порогам
         """
+        if criterion not in ("gini", "entropy"):
+            raise ValueError(f"Неизвестный критерий: {criterion}")
+
         self.max_depth = max_depth
         self.min_samples_split = min_samples_split
         self.min_samples_leaf = min_samples_leaf
         self.random_state = random_state
-        self.root: Optional[Node] = None
-
-    def _gini_impurity(self, y: np.ndarray) -> float:
-        """Вычисление коэффициента Джини"""
-        _, counts = np.unique(y, return_counts=True)
-        probabilities = counts / len(y)
-        return float(1 - np.sum(probabilities**2))
-
-    def _entropy(self, y: np.ndarray) -> float:
-        """Вычисление энтропии"""
-        _, counts = np.unique(y, return_counts=True)
-        probabilities = counts / len(y)
-        return float(-np.sum(probabilities * np.log2(probabilities + 1e-8)))
-
-    def _information_gain(
-        self, X: np.ndarray, y: np.ndarray, feature: int, threshold: float
-    ) -> float:
-        """Вычисление информационного выигрыша"""
-        # Разделение данных
-        left_mask = X[:, feature] <= threshold
-        right_mask = ~left_mask
-
-        if np.sum(left_mask) == 0 or np.sum(right_mask) == 0:
-            return 0
-
-        # Взвешенная энтропия после разделения
-        n = len(y)
-        left_entropy = self._entropy(y[left_mask])
-        right_entropy = self._entropy(y[right_mask])
-
-        weighted_entropy = (np.sum(left_mask) / n) * left_entropy + (
-            np.sum(right_mask) / n
-        ) * right_entropy
-
-        # Информационный выигрыш
-        return float(self._entropy(y) - weighted_entropy)
-
-    def _best_split(self, X: np.ndarray, y: np.ndarray) -> tuple:
-        """Поиск лучшего разделения"""
-        best_gain = -1.0
-        best_feature = None
+        self.criterion = criterion
+        self.max_bins = max_bins
+        self.binner_: Optional[FeatureBinner] = None
+        self.nodes_: Optional[np.ndarray] = None
+        self._nodes: List[list] = []
+        self._features: np.ndarray = np.empty(0, dtype=np.intp)
+        self._all_features = True
+        self._in_left: np.ndarray = np.empty(0, dtype=bool)
+        self.classes_: np.ndarray = np.empty(0)
+        self.n_classes_ = 0
+
+    @staticmethod
+    def _gini_from_counts(counts: np.ndarray) -> float:
+        """Коэффициент Джини по вектору количеств образцов каждого класса"""
+        n_samples = counts.sum()
+        return float(1 - (counts * counts).sum() / (n_samples * n_samples))
+
+    @staticmethod
+    def _entropy_from_counts(counts: np.ndarray) -> float:
+        """Энтропия по вектору количеств образцов каждого класса"""
+        probabilities = counts[counts > 0] / counts.sum()
+        return float(-np.sum(probabilities * np.log2(probabilities)))
+
+    @staticmethod
+    def _xlog2x(values: np.ndarray) -> np.ndarray:
+        """x * log2(x) для неотрицательных количеств (0 при x = 0)"""
+        return values * np.log2(np.maximum(values, 1))
+
+    def _weighted_impurities(
+        self, ys: np.ndarray, total_counts: np.ndarray
+    ) -> np.ndarray:
+        """
+        Сумма n_left * I(left) + n_right * I(right) для каждого порога
+
+        ys - классы образцов, отсортированных по каждому признаку,
+        shape (n_samples, n_features); порог i отделяет первые i + 1 образцов.
+        Количества классов слева - накопленная сумма по каждому классу,
+        результат shape (n_samples - 1, n_features).
+        """
+        n_samples = ys.shape[0]
+        n_left = np.arange(1, n_samples, dtype=np.float64)[:, np.newaxis]
+        n_right = n_samples - n_left
+
+        left_sum = np.zeros((n_samples - 1, ys.shape[1]))
+        right_sum = np.zeros_like(left_sum)
+        for class_index, class_total in enumerate(total_counts):
+            if class_total == 0:
+                continue
+            left = np.cumsum(ys[:-1] == class_index, axis=0, dtype=np.float64)
+            right = class_total - left
+            if self.criterion == "gini":
+                left_sum += left * left
+                right_sum += right * right
+            else:
+                left_sum += self._xlog2x(left)
+                right_sum += self._xlog2x(right)
+
+        if self.criterion == "gini":
+            # n * (1 - sum(c^2) / n^2) = n - sum(c^2) / n
+            return n_samples - left_sum / n_left - right_sum / n_right
+        # n * H = n * log2(n) - sum(c * log2(c))
+        return self._xlog2x(n_left) - left_sum + self._xlog2x(n_right) - right_sum
+
+    def _take(
+        self, X: np.ndarray, rows: np.ndarray, columns: np.ndarray, start: int
+    ) -> np.ndarray:
+        """
+        Подматрица X[rows][:, columns], columns = self._features[start:...]
+
+        Если используются все признаки, столбцы берутся срезом: индексация
+        по строкам и срезу быстрее, чем np.ix_.
+        """
+        if self._all_features:
+            return X[rows, start : start + len(columns)]
+        return X[np.ix_(rows, columns)]
+
+    def _best_split(
+        self, X: np.ndarray, y: np.ndarray, order: np.ndarray, total_counts: np.ndarray
+    ) -> tuple:
+        """
+        Поиск лучшего разделения
+
+        order - строки узла, отсортированные по каждому признаку из
+        self._features, shape (n_features, n_samples); total_counts -
+        количества классов в узле (считаются в _build_tree).
+        Возвращает (позиция признака в self._features, порог, выигрыш,
+        число образцов слева).
+
+        Признаки обрабатываются блоками по ~SPLIT_BLOCK_SIZE элементов:
+        примеси всех порогов блока считаются векторно по накопленным
+        количествам классов. В больших узлах временные массивы блока остаются
+        в кеше.
+        """
+        n_features, n_samples = order.shape
+        parent_impurity = (
+            self._gini_from_counts(total_counts)
+            if self.criterion == "gini"
+            else self._entropy_from_counts(total_counts)
+        )
+
+        best_gain = 0.0
+        best_position = None
         best_threshold = None
+        best_n_left = 0
+
+        if n_samples < 2:
+            return best_position, best_threshold, best_gain, best_n_left
+
+        block = max(1, SPLIT_BLOCK_SIZE // n_samples)
+        for start in range(0, n_features, block):
+            rows = order[start : start + block].T
+            columns = self._features[start : start + block]
+            xs = X[rows, columns]
+            ys = y[rows]
+
+            weighted = self._weighted_impurities(ys, total_counts) / n_samples
+            gains = parent_impurity - weighted
+            # Порог возможен только между различными значениями
+            gains[xs[:-1] == xs[1:]] = -np.inf
+
+            # Лучший порог каждого признака; при равенстве - первый признак
+            best_rows = np.argmax(gains, axis=0)
+            feature_gains = gains[best_rows, np.arange(xs.shape[1])]
+            column = int(np.argmax(feature_gains))
+
+            if feature_gains[column] > best_gain:
+                i = int(best_rows[column])
+                best_gain = float(feature_gains[column])
+                best_position = start + column
+                best_n_left = i + 1
+                best_threshold = (xs[i, column] + xs[i + 1, column]) / 2
+                # Середина может округлиться до правого значения
+                if best_threshold >= xs[i + 1, column]:
+                    best_threshold = xs[i, column]
+
+        return best_position, best_threshold, best_gain, best_n_left
+
+    def _histogram(
+        self, X_binned: np.ndarray, y: np.ndarray, rows: np.ndarray
+    ) -> np.ndarray:
+        """
+        Количества классов по корзинам, shape (n_features, n_bins, n_classes)
+
+        Считается по строкам rows и признакам self._features без копирования
+        всего узла.
+
+        Малые узлы считаются одним np.bincount по всем признакам. В больших
+        узлах признаки обрабатываются по одному с кодами "корзина * C + класс"
+        в uint16: промежуточные массивы вчетверо меньше, чем с intp.
+        """
+        n_samples, n_features = len(rows), len(self._features)
+        y = y[rows]
+        n_bins = self.binner_.max_bins if self.binner_ is not None else 256
+        cell = n_bins * self.n_classes_
+
+        if n_samples * n_features <= SPLIT_BLOCK_SIZE or cell > 1 << 16:
+            codes = self._take(X_binned, rows, self._features, 0).astype(np.intp)
+            codes = codes * self.n_classes_ + y[:, np.newaxis]
+            codes += np.arange(n_features) * cell
+            counts = np.bincount(codes.ravel(), minlength=n_features * cell)
+            return counts.reshape(n_features, n_bins, self.n_classes_)
+
+        hist = np.empty((n_features, cell), dtype=np.intp)
+        classes = y.astype(np.uint16)
+        n_classes = np.uint16(self.n_classes_)
+        for position, feature in enumerate(self._features):
+            # Явное приведение: в NumPy 1.x uint8 * скаляр uint16 остается uint8
+            bins = X_binned[rows, feature].astype(np.uint16)
+            codes = bins * n_classes + classes
+            hist[position] = np.bincount(codes, minlength=cell)
+        return hist.reshape(n_features, n_bins, self.n_classes_)
+
+    def _best_split_hist(self, hist: np.ndarray) -> tuple:
+        """
+        Поиск лучшего разделения по гистограмме узла
 
-        n_features = X.shape[1]
+        Кандидаты - границы корзин: O(F * B * C) независимо от числа образцов.
+        Возвращает (столбец X, корзина, порог, выигрыш).
+        """
+        total_counts = hist[0].sum(axis=0)
+        n_samples = total_counts.sum()
+
+        left = np.cumsum(hist[:, :-1], axis=1, dtype=np.float64)
+        right = total_counts - left
+        n_left = left.sum(axis=2)
+        n_right = n_samples - n_left
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if self.criterion == "gini":
+                parent_impurity = self._gini_from_counts(total_counts)
+                weighted = (
+                    n_samples
+                    - (left * left).sum(axis=2) / n_left
+                    - (right * right).sum(axis=2) / n_right
+                )
+            else:
+                parent_impurity = self._entropy_from_counts(total_counts)
+                weighted = (
+                    self._xlog2x(n_left)
+                    - self._xlog2x(left).sum(axis=2)
+                    + self._xlog2x(n_right)
+                    - self._xlog2x(right).sum(axis=2)
+                )
+        gains = parent_impurity - weighted / n_samples
+        gains[(n_left == 0) | (n_right == 0)] = -np.inf
+
+        # При равенстве выигрыша - первый признак, затем первая корзина
+        feature, bin_index = np.unravel_index(np.argmax(gains), gains.shape)
+        best_gain = float(gains[feature, bin_index])
+        if not best_gain > 0 or self.binner_ is None:
+            return None, None, None, 0.0
+
+        column = int(self._features[feature])
+        threshold = self.binner_.bin_edges_[column][bin_index]
+        return column, int(bin_index), threshold, best_gain
+
+    def _build_tree_hist(
+        self,
+        X_binned: np.ndarray,
+        y: np.ndarray,
+        rows: np.ndarray,
+        hist: np.ndarray,
+        depth: int = 0,
+    ) -> int:
+        """
+        Рекурсивное построение дерева по гистограммам
 
-        for feature in range(n_features):
-            thresholds = np.unique(X[:, feature])
+        Гистограмма строится только для меньшего потомка, гистограмма
+        большего получается вычитанием из гистограммы родителя.
+        """
+        n_samples = len(rows)
+        counts = hist[0].sum(axis=0)
+        n_classes = np.count_nonzero(counts)
 
-            for threshold in thresholds:
-                gain = self._information_gain(X, y, feature, threshold)
+        # Условия остановки
+        if (
+            depth >= self.max_depth
+            or n_classes == 1
+            or n_samples < self.min_samples_split
+        ):
+            return self._add_leaf(counts)
 
-                if gain > best_gain:
-                    best_gain = gain
-                    best_feature = feature
-                    best_threshold = threshold
+        feature, bin_index, threshold, _ = self._best_split_hist(hist)
+        if feature is None:
+            return self._add_leaf(counts)
 
-        return best_feature, best_threshold, best_gain
+        left_mask = X_binned[rows, feature] <= bin_index
+        n_left = int(np.count_nonzero(left_mask))
 
-    def _most_common_class(self, y: np.ndarray) -> Union[int, float]:
-        """Определение наиболее частого класса"""
-        values, counts = np.unique(y, return_counts=True)
-        result = values[np.argmax(counts)]
-        if isinstance(result, (int, float)):
-            return result
+        # Проверка минимального количества образцов в листе
+        if n_left < self.min_samples_leaf or n_samples - n_left < self.min_samples_leaf:
+            return self._add_leaf(counts)
+
+        left_rows = rows[left_mask]
+        right_rows = rows[~left_mask]
+        if n_left <= n_samples - n_left:
+            left_hist = self._histogram(X_binned, y, left_rows)
+            right_hist = hist - left_hist
         else:
-            return float(result)
+            right_hist = self._histogram(X_binned, y, right_rows)
+            left_hist = hist - right_hist
 
-    def _build_tree(self, X: np.ndarray, y: np.ndarray, depth: int = 0) -> Node:
-        """Рекурсивное построение дерева"""
-        n_samples, n_features = X.shape
-        n_classes = len(np.unique(y))
+        node_id = self._add_split(feature, threshold)
+        self._nodes[node_id][2] = self._build_tree_hist(
+            X_binned, y, left_rows, left_hist, depth + 1
+        )
+        self._nodes[node_id][3] = self._build_tree_hist(
+            X_binned, y, right_rows, right_hist, depth + 1
+        )
+        return node_id
+
+    def _most_common_class(self, counts: np.ndarray) -> int:
+        """Индекс наиболее частого класса в self.classes_ по количествам"""
+        return int(np.argmax(counts))
+
+    def _add_leaf(self, counts: np.ndarray) -> int:
+        """Добавление листа с наиболее частым классом, возвращает индекс узла"""
+        self._nodes.append([-1, 0.0, -1, -1, self._most_common_class(counts)])
+        return len(self._nodes) - 1
+
+    def _add_split(self, feature: int, threshold: float) -> int:
+        """Добавление внутреннего узла (потомки заполняются позже)"""
+        self._nodes.append([feature, threshold, -1, -1, -1])
+        return len(self._nodes) - 1
+
+    def _build_tree(
+        self, X: np.ndarray, y: np.ndarray, order: np.ndarray, depth: int = 0
+    ) -> int:
+        """
+        Рекурсивное построение дерева
+
+        order - строки X в узле, отсортированные по каждому признаку,
+        shape (n_features, n_samples); y - индексы классов в self.classes_
+        для всех строк X. Сортировка выполняется один раз в корне: при
+        разделении каждая строка order разбивается на левую и правую части
+        с сохранением порядка. Возвращает индекс узла в self._nodes.
+        Количества классов считаются один раз и используются и для условий
+        остановки, и для поиска разделения, и для значения листа.
+        """
+        n_samples = order.shape[1]
+        counts = np.bincount(y[order[0]], minlength=self.n_classes_)
+        n_classes = np.count_nonzero(counts)
 
         # Условия остановки
         if (
@@ -129,66 +423,150 @@ class DecisionTree:
             or n_classes == 1
             or n_samples < self.min_samples_split
         ):
-            leaf_value = self._most_common_class(y)
-            return Node(value=leaf_value)
+            return self._add_leaf(counts)
 
         # Поиск лучшего разделения
-        best_feature, best_threshold, best_gain = self._best_split(X, y)
-
-        if best_gain == 0:
-            leaf_value = self._most_common_class(y)
-            return Node(value=leaf_value)
+        position, best_threshold, best_gain, n_left = self._best_split(
+            X, y, order, counts
+        )
 
-        # Создание разделения
-        left_mask = X[:, best_feature] <= best_threshold
-        right_mask = ~left_mask
+        if position is None:
+            return self._add_leaf(counts)
 
         # Проверка минимального количества образцов в листе
-        if (
-            np.sum(left_mask) < self.min_samples_leaf
-            or np.sum(right_mask) < self.min_samples_leaf
-        ):
-            leaf_value = self._most_common_class(y)
-            return Node(value=leaf_value)
+        if n_left < self.min_samples_leaf or n_samples - n_left < self.min_samples_leaf:
+            return self._add_leaf(counts)
 
-        # Рекурсивное построение поддеревьев
-        left_subtree = self._build_tree(X[left_mask], y[left_mask], depth + 1)
-        right_subtree = self._build_tree(X[right_mask], y[right_mask], depth + 1)
+        # Левые строки - префикс порядка по признаку разделения. Одинаковые
+        # строки (bootstrap) всегда попадают в одну сторону.
+        in_left = self._in_left
+        left_rows = order[position, :n_left]
+        in_left[left_rows] = True
+        left_mask = in_left[order]
+        in_left[left_rows] = False
+
+        n_features = order.shape[0]
+        left_order = order[left_mask].reshape(n_features, n_left)
+        right_order = order[~left_mask].reshape(n_features, n_samples - n_left)
 
-        return Node(best_feature, best_threshold, left_subtree, right_subtree)
+        # Рекурсивное построение поддеревьев
+        node_id = self._add_split(int(self._features[position]), best_threshold)
+        self._nodes[node_id][2] = self._build_tree(X, y, left_order, depth + 1)
+        self._nodes[node_id][3] = self._build_tree(X, y, right_order, depth + 1)
+        return node_id
 
-    def fit(self, X: np.ndarray, y: np.ndarray) -> "DecisionTree":
+    def fit(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        sample_indices: Optional[np.ndarray] = None,
+        feature_indices: Optional[np.ndarray] = None,
+    ) -> "DecisionTree":
         """
         Обучение дерева решений
 
         Args:
             X: Признаки, shape (n_samples, n_features)
             y: Целевые значения, shape (n_samples,)
+            sample_indices: Строки X для обучения (могут повторяться, например
+                bootstrap); None - все строки
+            feature_indices: Признаки, по которым ищутся разделения;
+                None - все признаки
 
         Returns:
             self: Обученная модель
         """
+        if self.max_bins is None:
+            self.binner_ = None
+            return self._fit(X, y, sample_indices, feature_indices)
+
+        binner = FeatureBinner(self.max_bins).fit(X)
+        return self.fit_binned(
+            binner.transform(X), y, binner, sample_indices, feature_indices
+        )
+
+    def fit_binned(
+        self,
+        X_binned: np.ndarray,
+        y: np.ndarray,
+        binner: FeatureBinner,
+        sample_indices: Optional[np.ndarray] = None,
+        feature_indices: Optional[np.ndarray] = None,
+    ) -> "DecisionTree":
+        """
+        Обучение по гистограммам на уже разбитых на корзины признаках
+
+        X_binned = binner.transform(X): данные разбиваются один раз и могут
+        использоваться несколькими деревьями (RandomForest).
+        """
+        self.binner_ = binner
+        return self._fit(X_binned, y, sample_indices, feature_indices)
+
+    def _fit(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        sample_indices: Optional[np.ndarray],
+        feature_indices: Optional[np.ndarray],
+    ) -> "DecisionTree":
+        """Построение дерева по индексам строк и признаков общих X и y"""
         if self.random_state:
             np.random.seed(self.random_state)
 
-        self.root = self._build_tree(X, y)
-        if self.root is None:
-            raise ValueError("Ошибка при построении дерева")
-        return self
+        # Классы кодируются индексами: количества считаются через np.bincount
+        self.classes_, y_encoded = np.unique(y, return_inverse=True)
+        self.n_classes_ = len(self.classes_)
 
-    def _predict_sample(self, x: np.ndarray, node: Node) -> Union[int, float]:
-        """Предсказание для одного образца"""
-        if node.value is not None:  # Листовой узел
-            return node.value
+        rows = (
+            np.arange(len(y), dtype=np.intp)
+            if sample_indices is None
+            else np.asarray(sample_indices, dtype=np.intp)
+        )
+        self._all_features = feature_indices is None
+        self._features = (
+            np.arange(X.shape[1], dtype=np.intp)
+            if feature_indices is None
+            else np.asarray(feature_indices, dtype=np.intp)
+        )
 
-        if x[node.feature] <= node.threshold:
-            if node.left is None:
-                raise ValueError("Левый узел не найден")
-            return self._predict_sample(x, node.left)
+        self._nodes = []
+        if self.binner_ is None:
+            # Единственная сортировка: строки по каждому признаку
+            positions = np.argsort(
+                self._take(X, rows, self._features, 0), axis=0, kind="stable"
+            )
+            self._in_left = np.zeros(len(y), dtype=bool)
+            self._build_tree(X, y_encoded, rows[positions.T])
+            self._in_left = np.empty(0, dtype=bool)
         else:
-            if node.right is None:
-                raise ValueError("Правый узел не найден")
-            return self._predict_sample(x, node.right)
+            self._build_tree_hist(
+                X, y_encoded, rows, self._histogram(X, y_encoded, rows)
+            )
+        if not self._nodes:
+            raise ValueError("Ошибка при построении дерева")
+
+        self.nodes_ = np.array([tuple(node) for node in self._nodes], dtype=NODE_DTYPE)
+        self._nodes = []
+        return self
+
+    @property
+    def root(self) -> Optional[Node]:
+        """Корень дерева в виде связанных объектов Node (для совместимости)"""
+        if self.nodes_ is None:
+            return None
+        return self._to_node(self.nodes_, 0)
+
+    def _to_node(self, nodes: np.ndarray, node_id: int) -> Node:
+        """Сборка объекта Node из узла node_id массива nodes"""
+        feature, threshold, left, right, value = nodes[node_id].tolist()
+        if feature < 0:
+            return Node(value=self.classes_[value].item())
+        return Node(
+            feature,
+            threshold,
+            self._to_node(nodes, left),
+            self._to_node(nodes, right),
+        )
 
     def predict(self, X: np.ndarray) -> np.ndarray:
         """
@@ -200,11 +578,24 @@ class DecisionTree:
         Returns:
             predictions: Предсказанные классы, shape (n_samples,)
         """
-        if self.root is None:
+        if self.nodes_ is None:
             raise ValueError("Модель не обучена. Вызовите fit() перед predict()")
 
-        predictions = np.array([self._predict_sample(x, self.root) for x in X])
-        return predictions
+        feature = self.nodes_["feature"]
+        threshold = self.nodes_["threshold"]
+        left = self.nodes_["left"]
+        right = self.nodes_["right"]
+
+        # Все образцы спускаются по дереву одновременно, по уровню за шаг
+        node_ids = np.zeros(X.shape[0], dtype=np.intp)
+        active = np.flatnonzero(feature[node_ids] >= 0)
+        while active.size:
+            current = node_ids[active]
+            go_left = X[active, feature[current]] <= threshold[current]
+            node_ids[active] = np.where(go_left, left[current], right[current])
+            active = active[feature[node_ids[active]] >= 0]
+
+        return self.classes_[self.nodes_["value"][node_ids]]
 
     def score(self, X: np.ndarray, y: np.ndarray) -> float:
         """
@@ -248,6 +639,19 @@ def main() -> None:
         default=1,
         help="Минимальное количество образцов в листе",
     )
+    parser.add_argument(
+        "--criterion",
+        type=str,
+        default="gini",
+        choices=["gini", "entropy"],
+        help="Критерий разделения",
+    )
+    parser.add_argument(
+        "--max-bins",
+        type=int,
+        default=None,
+        help="Число корзин для приближенного поиска разделений (до 256)",
+    )
     parser.add_argument(
         "--test-size", type=float, default=0.2, help="Доля данных для тестирования"
     )
@@ -283,6 +687,8 @@ def main() -> None:
             min_samples_split=args.min_samples_split,
             min_samples_leaf=args.min_samples_leaf,
             random_state=args.random_state,
+            criterion=args.criterion,
+            max_bins=args.max_bins,
         )
 
         tree.fit(X_train, y_train)
@@ -3,9 +3,14 @@
 """
 
 import argparse
-from typing import Optional
+from typing import Optional, Tuple
 
 import numpy as np
+from numpy.typing import DTypeLike
+
+# Число элементов (образцы * кластеры) в блоке шага Ллойда: матрица
+# расстояний блока помещается в кеш процессора
+ASSIGN_BLOCK_SIZE = 1 << 16
 
 
 class KMeans:
@@ -18,6 +23,9 @@ class KMeans:
         n_clusters: int = 3,
         max_iters: int = 100,
         random_state: Optional[int] = None,
+        init: str = "k-means++",
+        algorithm: str = "lloyd",
+        dtype: DTypeLike = np.float32,
     ):
         """
         Инициализация KMeans
@@ -26,63 +34,219 @@ class KMeans:
             n_clusters: Количество кластеров
             max_iters: Максимальное количество итераций
             random_state: Зерно случайности
+            init: Инициализация центроидов: "k-means++" или "random"
+            algorithm: "lloyd" или "elkan" (отсечение расстояний по неравенству
+                треугольника, выгодно при большом n_clusters)
+            dtype: Тип данных для расчетов (float32 вдвое уменьшает объем
+                памяти и ускоряет матричные умножения)
         """
+        if init not in ("k-means++", "random"):
+            raise ValueError(f"Неизвестный способ инициализации: {init}")
+        if algorithm not in ("lloyd", "elkan"):
+            raise ValueError(f"Неизвестный алгоритм: {algorithm}")
+
         self.n_clusters = n_clusters
         self.max_iters = max_iters
         self.random_state = random_state
+        self.init = init
+        self.algorithm = algorithm
+        self.dtype = np.dtype(dtype)
         self.centroids: Optional[np.ndarray] = None
         self.labels: Optional[np.ndarray] = None
         self.inertia: Optional[float] = None
 
-    def _initialize_centroids(self, X: np.ndarray) -> np.ndarray:
-        """Инициализация центроидов случайным образом"""
+    def _initialize_centroids(
+        self, X: np.ndarray, x_norms: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Инициализация центроидов
+
+        k-means++: первый центроид выбирается случайно, каждый следующий - с
+        вероятностью, пропорциональной квадрату расстояния до ближайшего уже
+        выбранного. Обычно сокращает число итераций fit.
+        """
         if self.random_state:
             np.random.seed(self.random_state)
 
         n_samples, n_features = X.shape
-        centroids = np.zeros((self.n_clusters, n_features))
-
-        for i in range(self.n_clusters):
-            centroid = X[np.random.choice(n_samples)]
-            centroids[i] = centroid
+        if self.init == "random":
+            return X[np.random.choice(n_samples, self.n_clusters)]
+
+        centroids = np.zeros((self.n_clusters, n_features), dtype=X.dtype)
+        centroids[0] = X[np.random.choice(n_samples)]
+        closest = self._calculate_distance(X, centroids[:1], x_norms)[:, 0]
+
+        for i in range(1, self.n_clusters):
+            total = closest.sum(dtype=np.float64)
+            if total > 0:
+                index = np.random.choice(n_samples, p=closest / total)
+            else:
+                # Все точки совпадают с выбранными центроидами
+                index = np.random.choice(n_samples)
+            centroids[i] = X[index]
+            np.minimum(
+                closest,
+                self._calculate_distance(X, centroids[i : i + 1], x_norms)[:, 0],
+                out=closest,
+            )
 
         return centroids
 
-    def _calculate_distance(self, X: np.ndarray, centroids: np.ndarray) -> np.ndarray:
-        """Вычисление евклидовых расстояний от точек до центроидов"""
-        distances = np.zeros((X.shape[0], self.n_clusters))
+    def _calculate_distance(
+        self,
+        X: np.ndarray,
+        centroids: np.ndarray,
+        x_norms: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Вычисление квадратов евклидовых расстояний от точек до центроидов
 
-        for idx, centroid in enumerate(centroids):
-            distances[:, idx] = np.sqrt(np.sum((X - centroid) ** 2, axis=1))
+        Используется ||x - c||^2 = ||x||^2 + ||c||^2 - 2 x·c: основная работа -
+        одно матричное умножение. Корень не извлекается, argmin от него не
+        зависит. x_norms - заранее посчитанные ||x||^2, shape (n_samples, 1).
+        """
+        if x_norms is None:
+            x_norms = np.einsum("ij,ij->i", X, X)[:, np.newaxis]
+        c_norms = np.einsum("ij,ij->i", centroids, centroids)
 
-        return distances
+        distances = X @ centroids.T
+        distances *= -2
+        distances += x_norms
+        distances += c_norms
+        # Ошибки округления могут дать небольшие отрицательные значения
+        return np.maximum(distances, 0, out=distances)
 
     def _assign_clusters(self, distances: np.ndarray) -> np.ndarray:
         """Назначение кластеров на основе минимальных расстояний"""
         result = np.argmin(distances, axis=1)
         return np.array(result, dtype=np.int32)
 
-    def _update_centroids(self, X: np.ndarray, labels: np.ndarray) -> np.ndarray:
-        """Обновление центроидов"""
-        centroids = np.zeros((self.n_clusters, X.shape[1]))
+    def _lloyd_step(
+        self, X: np.ndarray, centroids: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Шаг Ллойда: назначение кластеров и пересчет центроидов за один проход
 
-        for i in range(self.n_clusters):
-            cluster_points = X[labels == i]
-            if len(cluster_points) > 0:
-                centroids[i] = np.mean(cluster_points, axis=0)
+        X обрабатывается блоками по ASSIGN_BLOCK_SIZE элементов: для блока
+        считаются расстояния, метки и суммы точек кластеров (one-hot @ X), так
+        что полная матрица (n_samples, n_clusters) не создается. ||x||^2 не
+        влияет на argmin и не учитывается. Пустой кластер остается на месте.
+        """
+        n_samples = X.shape[0]
+        labels = np.empty(n_samples, dtype=np.int32)
+        sums = np.zeros(centroids.shape)
+        counts = np.zeros(self.n_clusters, dtype=np.intp)
+
+        c_norms = np.einsum("ij,ij->i", centroids, centroids)
+        cluster_ids = np.arange(self.n_clusters)
+        block = max(1, ASSIGN_BLOCK_SIZE // self.n_clusters)
+
+        for start in range(0, n_samples, block):
+            X_block = X[start : start + block]
+            distances = X_block @ centroids.T
+            distances *= -2
+            distances += c_norms
+            block_labels = np.argmin(distances, axis=1)
+            labels[start : start + block] = block_labels
+
+            one_hot = (block_labels[:, np.newaxis] == cluster_ids).astype(X.dtype)
+            sums += one_hot.T @ X_block
+            counts += np.bincount(block_labels, minlength=self.n_clusters)
+
+        new_centroids = centroids.copy()
+        non_empty = counts > 0
+        new_centroids[non_empty] = sums[non_empty] / counts[non_empty, np.newaxis]
+
+        return labels, new_centroids
+
+    def _update_centroids(
+        self, X: np.ndarray, labels: np.ndarray, previous: np.ndarray
+    ) -> np.ndarray:
+        """
+        Центроиды по готовым меткам за один проход по данным
+
+        Суммы точек кластеров считаются через np.bincount с весами по каждому
+        признаку. Пустой кластер остается на месте центроида из previous.
+        """
+        counts = np.bincount(labels, minlength=self.n_clusters)
+        sums = np.column_stack(
+            [
+                np.bincount(labels, weights=X[:, j], minlength=self.n_clusters)
+                for j in range(X.shape[1])
+            ]
+        )
 
+        centroids = previous.copy()
+        non_empty = counts > 0
+        centroids[non_empty] = sums[non_empty] / counts[non_empty, np.newaxis]
         return centroids
 
+    def _fit_elkan(
+        self, X: np.ndarray, centroids: np.ndarray, x_norms: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Итерации K-Means с отсечением по неравенству треугольника
+
+        Вариант Elkan с одной нижней границей на точку (Hamerly): upper -
+        верхняя граница расстояния до своего центроида, lower - нижняя граница
+        расстояния до всех остальных. Точка пересчитывается, только если
+        границы не доказывают, что ее кластер не изменился; пересчет идет одним
+        матричным умножением на подмножестве точек.
+        """
+        n_samples = X.shape[0]
+        labels = np.zeros(n_samples, dtype=np.int32)
+        upper = np.zeros(n_samples)
+        lower = np.zeros(n_samples)
+
+        def assign(rows: np.ndarray) -> bool:
+            """Точное назначение точек rows, True если метки изменились"""
+            distances = self._calculate_distance(X[rows], centroids, x_norms[rows])
+            nearest = np.argpartition(distances, 1, axis=1)[:, :2]
+            near = np.take_along_axis(distances, nearest, axis=1)
+            swap = near[:, 1] < near[:, 0]
+            first = np.where(swap, nearest[:, 1], nearest[:, 0]).astype(np.int32)
+
+            changed = bool(np.any(first != labels[rows]))
+            labels[rows] = first
+            upper[rows] = np.sqrt(near.min(axis=1))
+            lower[rows] = np.sqrt(near.max(axis=1))
+            return changed
+
+        if self.n_clusters == 1:
+            return labels, self._update_centroids(X, labels, centroids)
+        assign(np.arange(n_samples))
+
+        for _ in range(self.max_iters):
+            new_centroids = self._update_centroids(X, labels, centroids)
+            shift = np.sqrt(np.sum((new_centroids - centroids) ** 2, axis=1))
+            centroids = new_centroids
+
+            # Сдвиг центроидов ослабляет границы
+            upper += shift[labels]
+            lower -= shift.max()
+
+            # Половина расстояния до ближайшего другого центроида
+            half_centers = 0.5 * np.sqrt(self._calculate_distance(centroids, centroids))
+            np.fill_diagonal(half_centers, np.inf)
+            bound = np.maximum(lower, half_centers.min(axis=1)[labels])
+            candidates = np.flatnonzero(upper > bound)
+
+            # Уточнение верхней границы точным расстоянием до своего центроида
+            own = centroids[labels[candidates]]
+            upper[candidates] = np.sqrt(np.sum((X[candidates] - own) ** 2, axis=1))
+            rows = candidates[upper[candidates] > bound[candidates]]
+
+            if rows.size == 0 or not assign(rows):
+                break
+
+        return labels, centroids
+
     def _calculate_inertia(
         self, X: np.ndarray, labels: np.ndarray, centroids: np.ndarray
     ) -> float:
         """Вычисление инерции (суммы квадратов расстояний до центроидов)"""
-        inertia = 0
-        for i in range(self.n_clusters):
-            cluster_points = X[labels == i]
-            if len(cluster_points) > 0:
-                inertia += np.sum((cluster_points - centroids[i]) ** 2)
-        return inertia
+        # Накопление во float64, чтобы не терять точность на больших выборках
+        return float(np.sum((X - centroids[labels]) ** 2, dtype=np.float64))
 
     def fit(self, X: np.ndarray) -> "KMeans":
         """
@@ -94,32 +258,38 @@ class KMeans:
         Returns:
             self: Обученная модель
         """
-        # Инициализация центроидов
-        self.centroids = self._initialize_centroids(X)
+        # Расчеты идут в self.dtype на центрированных данных: без сдвига
+        # разложение ||x - c||^2 теряет точность во float32
+        X = np.asarray(X, dtype=np.float64)
+        offset = X.mean(axis=0)
+        X = np.ascontiguousarray(X - offset, dtype=self.dtype)
 
-        for iteration in range(self.max_iters):
-            # Вычисление расстояний
-            distances = self._calculate_distance(X, self.centroids)
+        # Нормы точек не меняются между итерациями
+        x_norms = np.einsum("ij,ij->i", X, X)[:, np.newaxis]
 
-            # Назначение кластеров
-            new_labels = self._assign_clusters(distances)
+        # Инициализация центроидов
+        centroids = self._initialize_centroids(X, x_norms)
 
-            # Проверка сходимости
-            if (
-                iteration > 0
-                and self.labels is not None
-                and np.array_equal(self.labels, new_labels)
-            ):
-                break
+        if self.algorithm == "elkan":
+            labels, centroids = self._fit_elkan(X, centroids, x_norms)
+        else:
+            labels = None
+            for iteration in range(self.max_iters):
+                # Назначение кластеров и новые центроиды
+                new_labels, new_centroids = self._lloyd_step(X, centroids)
 
-            self.labels = new_labels
+                # Проверка сходимости
+                if labels is not None and np.array_equal(labels, new_labels):
+                    break
 
-            # Обновление центроидов
-            self.centroids = self._update_centroids(X, self.labels)
+                labels = new_labels
+                centroids = new_centroids
 
         # Вычисление финальной инерции
-        if self.labels is not None and self.centroids is not None:
-            self.inertia = self._calculate_inertia(X, self.labels, self.centroids)
+        if labels is not None:
+            self.labels = labels
+            self.centroids = (centroids + offset).astype(self.dtype)
+            self.inertia = self._calculate_inertia(X, labels, centroids)
 
         return self
 
@@ -136,7 +306,12 @@ class KMeans:
         if self.centroids is None:
             raise ValueError("Модель не обучена. Вызовите fit() перед predict()")
 
-        distances = self._calculate_distance(X, self.centroids)
+        # Центрирование по центроидам, как и в fit
+        offset = self.centroids.mean(axis=0, dtype=np.float64)
+        X = np.asarray(X - offset, dtype=self.dtype)
+        centroids = (self.centroids - offset).astype(self.dtype)
+
+        distances = self._calculate_distance(X, centroids)
         return self._assign_clusters(distances)
 
     def fit_predict(self, X: np.ndarray) -> np.ndarray:
@@ -168,6 +343,20 @@ def main() -> None:
     parser.add_argument(
         "--random-state", type=int, default=42, help="Зерно случайности"
     )
+    parser.add_argument(
+        "--init",
+        type=str,
+        default="k-means++",
+        choices=["k-means++", "random"],
+        help="Инициализация центроидов",
+    )
+    parser.add_argument(
+        "--algorithm",
+        type=str,
+        default="lloyd",
+        choices=["lloyd", "elkan"],
+        help="Алгоритм итераций",
+    )
     parser.add_argument("--output", type=str, help="Путь для сохранения результатов")
 
     args = parser.parse_args()
@@ -187,6 +376,8 @@ def main() -> None:
             n_clusters=args.clusters,
             max_iters=args.max_iters,
             random_state=args.random_state,
+            init=args.init,
+            algorithm=args.algorithm,
         )
 
         labels = kmeans.fit_predict(X)
@@ -3,11 +3,16 @@
 """
 
 import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Union
 
 import numpy as np
 
-from .decision_tree import DecisionTree
+from .decision_tree import DecisionTree, FeatureBinner
+
+# Число пар (образец, дерево) в блоке совместного обхода деревьев в predict
+TRAVERSAL_BLOCK_SIZE = 1 << 14
 
 
 class RandomForest:
@@ -24,6 +29,8 @@ class RandomForest:
         max_features: Union[str, int, float] = "sqrt",
         bootstrap: bool = True,
         random_state: Optional[int] = None,
+        n_jobs: Optional[int] = None,
+        max_bins: Optional[int] = None,
     ):
         """
         Инициализация случайного леса
@@ -36,6 +43,9 @@ class RandomForest:
             max_features: Количество признаков для рассмотрения при разделении
             bootstrap: Использовать ли bootstrap выборку
             random_state: Зерно случайности
+            n_jobs: Число потоков для обучения деревьев (None - 1, -1 - все ядра)
+            max_bins: Число корзин для поиска разделений по гистограммам;
+                данные разбиваются на корзины один раз для всех деревьев
         """
         self.n_estimators = n_estimators
         self.max_depth = max_depth
@@ -44,14 +54,17 @@ class RandomForest:
         self.max_features = max_features
         self.bootstrap = bootstrap
         self.random_state = random_state
+        self.n_jobs = n_jobs
+        self.max_bins = max_bins
         self.trees: List[DecisionTree] = []
         self.feature_indices: List[np.ndarray] = []
+        self.classes_: np.ndarray = np.empty(0)
+        self.nodes_: Optional[np.ndarray] = None
+        self.roots_: np.ndarray = np.empty(0, dtype=np.intp)
 
-    def _get_bootstrap_sample(self, X: np.ndarray, y: np.ndarray) -> tuple:
-        """Создание bootstrap выборки"""
-        n_samples = X.shape[0]
-        indices = np.random.choice(n_samples, n_samples, replace=True)
-        return X[indices], y[indices]
+    def _get_bootstrap_indices(self, n_samples: int) -> np.ndarray:
+        """Индексы bootstrap выборки"""
+        return np.random.choice(n_samples, n_samples, replace=True)
 
     def _get_random_features(self, n_features: int) -> np.ndarray:
         """Случайный выбор признаков"""
@@ -83,37 +96,137 @@ class RandomForest:
         if self.random_state:
             np.random.seed(self.random_state)
 
-        self.trees = []
-        self.feature_indices = []
-
         n_samples, n_features = X.shape
 
-        for i in range(self.n_estimators):
-            # Создание bootstrap выборки
-            if self.bootstrap:
-                X_bootstrap, y_bootstrap = self._get_bootstrap_sample(X, y)
-            else:
-                X_bootstrap, y_bootstrap = X, y
+        # Деревья получают индексы строк и признаков общих X и y, копии
+        # bootstrap выборок не создаются. Корзины считаются один раз.
+        binner = None
+        if self.max_bins is not None:
+            binner = FeatureBinner(self.max_bins).fit(X)
+            X = binner.transform(X)
 
-            # Случайный выбор признаков
+        # Случайные выборки готовятся последовательно в вызывающем потоке,
+        # поэтому результат не зависит от n_jobs
+        plan = []
+        for i in range(self.n_estimators):
+            sample_indices = (
+                self._get_bootstrap_indices(n_samples)
+                if self.bootstrap
+                else np.arange(n_samples)
+            )
             feature_indices = self._get_random_features(n_features)
-            self.feature_indices.append(feature_indices)
+            plan.append((i, sample_indices, feature_indices))
 
-            X_subset = X_bootstrap[:, feature_indices]
-
-            # Обучение дерева
+        def fit_tree(params: tuple) -> DecisionTree:
+            i, sample_indices, feature_indices = params
             tree = DecisionTree(
                 max_depth=self.max_depth,
                 min_samples_split=self.min_samples_split,
                 min_samples_leaf=self.min_samples_leaf,
                 random_state=self.random_state + i if self.random_state else None,
             )
+            if binner is not None:
+                return tree.fit_binned(X, y, binner, sample_indices, feature_indices)
+            return tree.fit(X, y, sample_indices, feature_indices)
+
+        # NumPy отпускает GIL в сортировках и агрегациях, деревья независимы
+        n_workers = self._n_workers()
+        if n_workers == 1:
+            self.trees = [fit_tree(params) for params in plan]
+        else:
+            with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                self.trees = list(executor.map(fit_tree, plan))
+        self.feature_indices = [feature_indices for _, _, feature_indices in plan]
 
-            tree.fit(X_subset, y_bootstrap)
-            self.trees.append(tree)
+        # Каждое дерево обучено на всем y, поэтому classes_ у всех деревьев общий
+        self.classes_ = self.trees[0].classes_ if self.trees else np.empty(0)
+        self._stack_trees()
 
         return self
 
+    def _stack_trees(self) -> None:
+        """
+        Объединение узлов всех деревьев в один массив NODE_DTYPE
+
+        Ссылки на потомков сдвигаются на смещение дерева, roots_ - индексы
+        корней. Обход всего леса идет по одному массиву.
+        """
+        if not self.trees:
+            self.nodes_ = None
+            return
+
+        sizes = [len(tree.nodes_) for tree in self.trees if tree.nodes_ is not None]
+        nodes = np.concatenate(
+            [tree.nodes_ for tree in self.trees if tree.nodes_ is not None]
+        )
+        self.roots_ = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.intp)
+
+        shift = np.repeat(self.roots_, sizes)
+        internal = nodes["feature"] >= 0
+        nodes["left"][internal] += shift[internal]
+        nodes["right"][internal] += shift[internal]
+        self.nodes_ = nodes
+
+    def _n_workers(self) -> int:
+        """Число потоков обучения по n_jobs"""
+        if self.n_jobs is None:
+            return 1
+        if self.n_jobs < 0:
+            return max(1, (os.cpu_count() or 1) + 1 + self.n_jobs)
+        return max(1, self.n_jobs)
+
+    def _vote_counts(self, X: np.ndarray) -> tuple:
+        """
+        Голоса деревьев за каждый класс
+
+        Все пары (образец, дерево) спускаются по общему массиву узлов
+        одновременно, по уровню за шаг; голоса считаются одним np.bincount.
+
+        Returns:
+            classes: Классы леса (по возрастанию)
+            counts: Количество голосов, shape (n_samples, n_classes)
+        """
+        nodes = self.nodes_
+        if nodes is None:
+            raise ValueError("Модель не обучена. Вызовите fit() перед predict()")
+
+        feature = nodes["feature"]
+        threshold = nodes["threshold"]
+        left = nodes["left"]
+        right = nodes["right"]
+
+        n_samples, n_features = X.shape
+        n_trees, n_classes = len(self.roots_), len(self.classes_)
+        counts = np.empty((n_samples, n_classes), dtype=np.intp)
+
+        # Образцы обрабатываются блоками, чтобы массивы обхода оставались в кеше
+        block = max(1, TRAVERSAL_BLOCK_SIZE // n_trees)
+        offsets = np.arange(block, dtype=np.intp) * n_classes
+        for start in range(0, n_samples, block):
+            X_block = np.ascontiguousarray(X[start : start + block]).ravel()
+            n_block = min(block, n_samples - start)
+
+            # Пара i * n_trees + t: образец i блока в дереве t; признак
+            # образца берется из плоского блока по индексу i * n_features + f
+            node_ids = np.tile(self.roots_, n_block)
+            row_starts = np.repeat(np.arange(n_block) * n_features, n_trees)
+            active = np.flatnonzero(feature[node_ids] >= 0)
+            while active.size:
+                current = node_ids[active]
+                values = X_block[row_starts[active] + feature[current]]
+                node_ids[active] = np.where(
+                    values <= threshold[current], left[current], right[current]
+                )
+                active = active[feature[node_ids[active]] >= 0]
+
+            # Значение листа - индекс класса в classes_
+            cells = nodes["value"][node_ids].reshape(n_block, n_trees)
+            cells = cells + offsets[:n_block, np.newaxis]
+            block_counts = np.bincount(cells.ravel(), minlength=n_block * n_classes)
+            counts[start : start + n_block] = block_counts.reshape(n_block, n_classes)
+
+        return self.classes_, counts
+
     def predict(self, X: np.ndarray) -> np.ndarray:
         """
         Предсказание классов
@@ -127,23 +240,9 @@ class RandomForest:
         if not self.trees:
             raise ValueError("Модель не обучена. Вызовите fit() перед predict()")
 
-        # Сбор предсказаний от всех деревьев
-        tree_predictions_list = []
-
-        for tree, feature_indices in zip(self.trees, self.feature_indices):
-            X_subset = X[:, feature_indices]
-            predictions = tree.predict(X_subset)
-            tree_predictions_list.append(predictions)
-
-        # Голосование (выбор наиболее частого класса)
-        tree_predictions = np.array(tree_predictions_list).T
-
-        final_predictions = []
-        for sample_predictions in tree_predictions:
-            values, counts = np.unique(sample_predictions, return_counts=True)
-            final_predictions.append(values[np.argmax(counts)])
-
-        return np.array(final_predictions)
+        # Голосование: при равенстве голосов - меньший класс
+        classes, counts = self._vote_counts(X)
+        return classes[np.argmax(counts, axis=1)]
 
     def predict_proba(self, X: np.ndarray) -> np.ndarray:
         """
@@ -158,28 +257,8 @@ class RandomForest:
         if not self.trees:
             raise ValueError("Модель не обучена. Вызовите fit() перед predict_proba()")
 
-        # Сбор предсказаний от всех деревьев
-        tree_predictions_list = []
-
-        for tree, feature_indices in zip(self.trees, self.feature_indices):
-            X_subset = X[:, feature_indices]
-            predictions = tree.predict(X_subset)
-            tree_predictions_list.append(predictions)
-
-        tree_predictions = np.array(tree_predictions_list).T
-
-        # Получение всех возможных классов
-        all_classes = np.unique(tree_predictions)
-        n_classes = len(all_classes)
-
-        # Вычисление вероятностей
-        probabilities = np.zeros((X.shape[0], n_classes))
-
-        for i, sample_predictions in enumerate(tree_predictions):
-            for j, class_label in enumerate(all_classes):
-                probabilities[i, j] = np.mean(sample_predictions == class_label)
-
-        return probabilities
+        _, counts = self._vote_counts(X)
+        return counts / len(self.trees)
 
     def score(self, X: np.ndarray, y: np.ndarray) -> float:
         """
@@ -244,6 +323,18 @@ def main() -> None:
         default="sqrt",
         help="Количество признаков для рассмотрения",
     )
+    parser.add_argument(
+        "--n-jobs",
+        type=int,
+        default=None,
+        help="Число потоков обучения (-1 - все ядра)",
+    )
+    parser.add_argument(
+        "--max-bins",
+        type=int,
+        default=None,
+        help="Число корзин для приближенного поиска разделений (до 256)",
+    )
     parser.add_argument(
         "--test-size", type=float, default=0.2, help="Доля данных для тестирования"
     )
@@ -281,6 +372,8 @@ def main() -> None:
             min_samples_leaf=args.min_samples_leaf,
             max_features=args.max_features,
             random_state=args.random_state,
+            n_jobs=args.n_jobs,
+            max_bins=args.max_bins,
         )
 
         print(f"Обучение случайного леса с {args.n_estimators} деревьями...")
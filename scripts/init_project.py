@@ -2,29 +2,115 @@
 """
 Скрипт инициализации проекта ML-Backend Playground
 """
+import asyncio
+import hashlib
+import json
 import os
 import sys
 import subprocess
 import shutil
+import time
+from collections import deque
 from pathlib import Path
+from typing import Deque, Dict, Optional, Sequence
 
+# Сколько последних строк вывода команды показывать при ошибке
+OUTPUT_TAIL_LINES = 200
 
-def run_command(command: str, description: str) -> bool:
-    """Выполнение команды с проверкой результата"""
+# Каталог байткода тестов: переживает запуски и кешируется в CI
+PYCACHE_PREFIX = ".pycache"
+
+# Кеш найденных исполняемых файлов между запусками, ключ - хеш PATH
+PROBE_CACHE_FILE = Path.home() / ".cache" / "ai-backend-playground" / "probe.json"
+
+
+def run_command(
+    command: Sequence[str], description: str, env: Optional[Dict[str, str]] = None
+) -> bool:
+    """
+    Выполнение команды с проверкой результата
+    
+    Команда передается списком аргументов и запускается без промежуточного
+    shell. Вывод читается построчно, в памяти хранятся только последние
+    OUTPUT_TAIL_LINES строк - они печатаются при ошибке.
+    """
     print(f"🔄 {description}...")
+    tail: Deque[str] = deque(maxlen=OUTPUT_TAIL_LINES)
     try:
-        result = subprocess.run(
-            command, 
-            shell=True, 
-            check=True, 
-            capture_output=True, 
-            text=True
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors="replace",
+            env=env
         )
-        print(f"✅ {description} - успешно")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ {description} - ошибка: {e.stderr}")
+    except FileNotFoundError:
+        print(f"❌ {description} - программа {command[0]} не найдена")
         return False
+    
+    with process:
+        assert process.stdout is not None
+        for line in process.stdout:
+            tail.append(line)
+    
+    if process.returncode != 0:
+        print(f"❌ {description} - ошибка:\n{''.join(tail)}")
+        return False
+    print(f"✅ {description} - успешно")
+    return True
+
+
+async def run_command_async(command: Sequence[str], description: str) -> bool:
+    """Асинхронное выполнение команды: независимые шаги идут параллельно"""
+    print(f"🔄 {description}...")
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT
+        )
+    except FileNotFoundError:
+        print(f"❌ {description} - программа {command[0]} не найдена")
+        return False
+    assert process.stdout is not None
+    
+    tail: Deque[str] = deque(maxlen=OUTPUT_TAIL_LINES)
+    async for line in process.stdout:
+        tail.append(line.decode(errors="replace"))
+    await process.wait()
+    
+    if process.returncode != 0:
+        print(f"❌ {description} - ошибка:\n{''.join(tail)}")
+        return False
+    print(f"✅ {description} - успешно")
+    return True
+
+
+def which_cached(names: tuple) -> Dict[str, Optional[str]]:
+    """
+    shutil.which для нескольких программ с кешем в PROBE_CACHE_FILE
+    
+    Кеш действителен, пока не изменился PATH и найденные файлы существуют;
+    ненайденные программы ищутся заново.
+    """
+    key = hashlib.blake2b(os.environ.get("PATH", "").encode()).hexdigest()
+    try:
+        cache = json.loads(PROBE_CACHE_FILE.read_text())
+    except (OSError, ValueError):
+        cache = {}
+    
+    cached = cache.get(key, {}) if isinstance(cache, dict) else {}
+    if all(cached.get(name) and os.path.isfile(cached[name]) for name in names):
+        return {name: cached[name] for name in names}
+    
+    found = {name: shutil.which(name) for name in names}
+    try:
+        PROBE_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        PROBE_CACHE_FILE.write_text(json.dumps({key: found}))
+    except OSError:
+        pass
+    return found
 
 
 def check_requirements():
@@ -38,14 +124,16 @@ def check_requirements():
         return False
     print(f"✅ Python {python_version.major}.{python_version.minor}.{python_version.micro}")
     
+    tools = which_cached(("docker", "docker-compose"))
+    
     # Проверка Docker
-    if not shutil.which("docker"):
+    if not tools["docker"]:
         print("❌ Docker не найден. Установите Docker Desktop")
         return False
     print("✅ Docker найден")
     
     # Проверка Docker Compose
-    if not shutil.which("docker-compose"):
+    if not tools["docker-compose"]:
         print("❌ Docker Compose не найден")
         return False
     print("✅ Docker Compose найден")
@@ -74,35 +162,69 @@ def setup_environment():
     return True
 
 
-def install_dependencies():
+async def install_dependencies() -> bool:
     """Установка зависимостей"""
     print("\n📦 Установка зависимостей...")
     
+    # Шаги pip зависят друг от друга и выполняются по порядку
     commands = [
-        ("python -m pip install --upgrade pip", "Обновление pip"),
-        ("pip install -r requirements.txt", "Установка зависимостей"),
-        ("pip install -e .", "Установка проекта в режиме разработки")
+        (["python", "-m", "pip", "install", "--upgrade", "pip"], "Обновление pip"),
+        (["pip", "install", "-r", "requirements.txt"], "Установка зависимостей"),
+        (["pip", "install", "-e", "."], "Установка проекта в режиме разработки")
     ]
     
     for command, description in commands:
-        if not run_command(command, description):
+        if not await run_command_async(command, description):
             return False
     
     return True
 
 
+async def prepare_project() -> bool:
+    """Установка зависимостей параллельно с загрузкой образа PostgreSQL"""
+    results = await asyncio.gather(
+        install_dependencies(),
+        run_command_async(
+            ["docker-compose", "pull", "db"], "Загрузка образа PostgreSQL"
+        ),
+    )
+    return all(results)
+
+
+def wait_for_database(timeout: float = 60.0) -> bool:
+    """Ожидание готовности PostgreSQL (pg_isready с нарастающей паузой)"""
+    deadline = time.monotonic() + timeout
+    delay = 0.1
+    
+    while True:
+        result = subprocess.run(
+            ["docker-compose", "exec", "-T", "db", "pg_isready", "-U", "postgres"],
+            capture_output=True,
+        )
+        if result.returncode == 0:
+            return True
+        if time.monotonic() + delay > deadline:
+            return False
+        time.sleep(delay)
+        delay = min(delay * 1.5, 2.0)
+
+
 def setup_database():
     """Настройка базы данных"""
     print("\n🗄️  Настройка базы данных...")
     
     # Запуск PostgreSQL в Docker
-    if not run_command("docker-compose up -d db", "Запуск PostgreSQL"):
+    if not run_command(
+        ["docker-compose", "up", "-d", "db"], "Запуск PostgreSQL"
+    ):
         return False
     
     # Ожидание готовности БД
     print("⏳ Ожидание готовности базы данных...")
-    import time
-    time.sleep(10)
+    if not wait_for_database():
+        print("❌ База данных не ответила за отведенное время")
+        return False
+    print("✅ База данных готова")
     
     return True
 
@@ -111,7 +233,25 @@ def run_tests():
     """Запуск тестов"""
     print("\n🧪 Запуск тестов...")
     
-    if not run_command("pytest tests/ -v", "Выполнение тестов"):
+    # Байткод пишется в общий каталог и переиспользуется при повторных запусках.
+    # PYTHONDONTWRITEBYTECODE отключает запись при любом непустом значении,
+    # поэтому переменная удаляется, а не выставляется в "0"
+    env = {
+        name: value for name, value in os.environ.items()
+        if name != "PYTHONDONTWRITEBYTECODE"
+    }
+    env["PYTHONPYCACHEPREFIX"] = PYCACHE_PREFIX
+    
+    # Файлы тестов независимы и выполняются параллельно (pytest-xdist);
+    # тесты одного файла остаются в одном процессе
+    if not run_command(
+        [
+            "pytest", "tests/", "-v", "-p", "no:cacheprovider",
+            "-n", "auto", "--dist=loadfile"
+        ],
+        "Выполнение тестов",
+        env=env
+    ):
         print("⚠️  Некоторые тесты могли не пройти - это нормально на начальном этапе")
     
     return True
@@ -132,8 +272,8 @@ def main():
         print("\n❌ Ошибка настройки окружения")
         sys.exit(1)
     
-    # Установка зависимостей
-    if not install_dependencies():
+    # Установка зависимостей (вместе с загрузкой образа БД)
+    if not asyncio.run(prepare_project()):
         print("\n❌ Ошибка установки зависимостей")
         sys.exit(1)
     
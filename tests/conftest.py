@@ -0,0 +1,21 @@
+"""
+Общие фикстуры тестов
+"""
+
+import numpy as np
+import pytest
+
+
+def _blobs(n=300, k=4, d=2, seed=42):
+    """Смесь k гауссиан: центры равномерно в [-10, 10], разброс 1.5"""
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform(-10, 10, (k, d))
+    y = rng.integers(0, k, n)
+    X = centers[y] + rng.normal(0, 1.5, (n, d))
+    return X, y
+
+
+@pytest.fixture(scope="session")
+def blobs():
+    """Тестовые данные: генерируются один раз на сессию"""
+    return _blobs()
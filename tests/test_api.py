@@ -2,22 +2,37 @@
 Интеграционные тесты для API
 """
 
-import asyncio
+import functools
+import json
+import uuid
 
 import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
 
+from backend.app.auth import password
 from backend.app.config import settings
 from backend.app.db import Base, get_db
 from backend.app.main import app
+from backend.app.models.task import Task
+from backend.app.models.user import User
 
-# Тестовая база данных
-TEST_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
+# Тестовая база данных в памяти: одно соединение на все сессии (StaticPool)
+TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
-engine = create_async_engine(TEST_DATABASE_URL, echo=False)
-TestingSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+engine = create_async_engine(
+    TEST_DATABASE_URL,
+    poolclass=StaticPool,
+    connect_args={"check_same_thread": False},
+    echo=False,
+)
+# Сервисы сами делают commit, неявный flush перед каждым запросом не нужен
+TestingSessionLocal = async_sessionmaker(
+    engine, expire_on_commit=False, autoflush=False
+)
 
 
 async def override_get_db():
@@ -28,35 +43,87 @@ async def override_get_db():
 
 app.dependency_overrides[get_db] = override_get_db
 
-client = TestClient(app)
+# Тесты и фикстуры модуля работают в одном event loop на всю сессию
+pytestmark = pytest.mark.asyncio(loop_scope="session")
 
 
-@pytest.fixture(scope="session")
-def event_loop():
-    """Создание event loop для тестов"""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
-
-
-@pytest.fixture(scope="session", autouse=True)
+@pytest_asyncio.fixture(scope="session", loop_scope="session", autouse=True)
 async def setup_test_db():
-    """Настройка тестовой базы данных"""
+    """Настройка тестовой базы данных (удалять нечего: БД живет в памяти)"""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
     yield
 
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
+
+@pytest.fixture(scope="session", autouse=True)
+def fast_password_hashing():
+    """
+    Дешевое хеширование паролей в тестах
+
+    Минимальная стоимость bcrypt (в 64 раза дешевле), а хеш одного и того же
+    пароля вычисляется один раз: соль случайна, поэтому повторно
+    использованный хеш проверяется так же, как новый.
+    """
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(password, "BCRYPT_ROUNDS", 4)
+        patch.setattr(
+            password,
+            "_bcrypt_hash",
+            functools.lru_cache(maxsize=8)(password._bcrypt_hash),
+        )
+        yield
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def aclient():
+    """Асинхронный клиент: приложение вызывается напрямую в event loop тестов"""
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        yield client
+
+
+async def login(aclient, username, password="testpassword123"):
+    """Вход пользователя, возвращает ответ /auth/login"""
+    return await aclient.post(
+        "/api/v1/auth/login", data={"username": username, "password": password}
+    )
+
+
+async def register_user(aclient, prefix="user"):
+    """Регистрация пользователя с уникальным именем и вход: (данные, заголовки)"""
+    # Уникальное имя: не конфликтует с пользователями других прогонов и воркеров
+    suffix = uuid.uuid4().hex[:12]
+    user_data = {
+        "email": f"{prefix}{suffix}@example.com",
+        "username": f"{prefix}{suffix}",
+        "password": "testpassword123",
+    }
+
+    register_response = await aclient.post("/api/v1/auth/register", json=user_data)
+    assert register_response.status_code == 200
+
+    login_response = await login(aclient, user_data["username"])
+    assert login_response.status_code == 200
+
+    token = login_response.json()["access_token"]
+    return user_data, {"Authorization": f"Bearer {token}"}
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def auth_headers(aclient):
+    """Пользователь, общий для всех тестов: регистрация и вход один раз"""
+    _, headers = await register_user(aclient, "sessionuser")
+    return headers
 
 
 class TestHealthCheck:
     """Тесты проверки состояния API"""
 
-    def test_root_endpoint(self):
+    async def test_root_endpoint(self, aclient):
         """Тест корневого эндпоинта"""
-        response = client.get("/")
+        response = await aclient.get("/")
         assert response.status_code == 200
 
         data = response.json()
@@ -64,9 +131,9 @@ class TestHealthCheck:
         assert "version" in data
         assert data["version"] == settings.VERSION
 
-    def test_health_endpoint(self):
+    async def test_health_endpoint(self, aclient):
         """Тест эндпоинта здоровья"""
-        response = client.get("/health")
+        response = await aclient.get("/health")
         assert response.status_code == 200
 
         data = response.json()
@@ -77,7 +144,7 @@ class TestHealthCheck:
 class TestAuthentication:
     """Тесты аутентификации"""
 
-    def test_register_user(self):
+    async def test_register_user(self, aclient):
         """Тест регистрации пользователя"""
         user_data = {
             "email": "test@example.com",
@@ -86,7 +153,7 @@ class TestAuthentication:
             "full_name": "Test User",
         }
 
-        response = client.post("/api/v1/auth/register", json=user_data)
+        response = await aclient.post("/api/v1/auth/register", json=user_data)
         if response.status_code != 200:
             print(f"Response status: {response.status_code}")
             print(f"Response body: {response.text}")
@@ -98,7 +165,7 @@ class TestAuthentication:
         assert "id" in data
         assert "hashed_password" not in data  # Пароль не должен возвращаться
 
-    def test_register_duplicate_user(self):
+    async def test_register_duplicate_user(self, aclient):
         """Тест регистрации дублирующегося пользователя"""
         user_data = {
             "email": "duplicate@example.com",
@@ -107,17 +174,17 @@ class TestAuthentication:
         }
 
         # Первая регистрация
-        response1 = client.post("/api/v1/auth/register", json=user_data)
+        response1 = await aclient.post("/api/v1/auth/register", json=user_data)
         if response1.status_code != 200:
             print(f"Response status: {response1.status_code}")
             print(f"Response body: {response1.text}")
         assert response1.status_code == 200
 
         # Попытка дублирования
-        response2 = client.post("/api/v1/auth/register", json=user_data)
+        response2 = await aclient.post("/api/v1/auth/register", json=user_data)
         assert response2.status_code == 400
 
-    def test_login_user(self):
+    async def test_login_user(self, aclient):
         """Тест входа пользователя"""
         # Сначала регистрируем пользователя
         user_data = {
@@ -126,7 +193,7 @@ class TestAuthentication:
             "password": "testpassword123",
         }
 
-        register_response = client.post("/api/v1/auth/register", json=user_data)
+        register_response = await aclient.post("/api/v1/auth/register", json=user_data)
         if register_response.status_code != 200:
             print(f"Register response status: {register_response.status_code}")
             print(f"Register response body: {register_response.text}")
@@ -138,69 +205,163 @@ class TestAuthentication:
             "password": user_data["password"],
         }
 
-        response = client.post("/api/v1/auth/login", data=login_data)
+        response = await aclient.post("/api/v1/auth/login", data=login_data)
         assert response.status_code == 200
 
         data = response.json()
         assert "access_token" in data
         assert data["token_type"] == "bearer"
 
-    def test_login_invalid_credentials(self):
+    async def test_login_password_over_72_bytes(self, aclient):
+        """Тест: пароль длиннее 72 байт не проходит по совпадению префикса"""
+        suffix = uuid.uuid4().hex[:12]
+        user_data = {
+            "email": f"longpass{suffix}@example.com",
+            "username": f"longpass{suffix}",
+            "password": "p" * 72,
+        }
+        response = await aclient.post("/api/v1/auth/register", json=user_data)
+        assert response.status_code == 200
+
+        response = await login(aclient, user_data["username"], "p" * 72 + "extra")
+        assert response.status_code == 401
+        response = await login(aclient, user_data["username"], "p" * 72)
+        assert response.status_code == 200
+
+    async def test_login_invalid_credentials(self, aclient):
         """Тест входа с неверными данными"""
         login_data = {"username": "nonexistent", "password": "wrongpassword"}
 
-        response = client.post("/api/v1/auth/login", data=login_data)
+        response = await aclient.post("/api/v1/auth/login", data=login_data)
         assert response.status_code == 401
 
 
-class TestTasks:
-    """Тесты для работы с задачами"""
+class TestUsers:
+    """Тесты для работы с пользователями"""
 
-    def setup_method(self):
-        """Подготовка для каждого теста"""
-        # Регистрируем пользователя и получаем токен
-        import random
-        import time
+    async def test_update_user_me(self, aclient):
+        """Тест обновления данных текущего пользователя"""
+        user_data, headers = await register_user(aclient)
+        new_email = f"updated{uuid.uuid4().hex[:12]}@example.com"
 
-        timestamp = int(time.time())
-        random_id = random.randint(1000, 9999)
-        user_data = {
-            "email": f"taskuser{timestamp}{random_id}@example.com",
-            "username": f"taskuser{timestamp}{random_id}",
-            "password": "testpassword123",
-        }
+        response = await aclient.put(
+            "/api/v1/users/me",
+            json={"full_name": "Updated Name", "email": new_email},
+            headers=headers,
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["full_name"] == "Updated Name"
+        assert data["email"] == new_email
+        assert data["username"] == user_data["username"]
 
-        register_response = client.post("/api/v1/auth/register", json=user_data)
-        if register_response.status_code != 200:
-            print(f"Register response status: {register_response.status_code}")
-            print(f"Register response body: {register_response.text}")
-            # Если пользователь уже существует, попробуем войти
-            if "already exists" in register_response.text:
-                login_data = {
-                    "username": user_data["username"],
-                    "password": user_data["password"],
-                }
-                login_response = client.post("/api/v1/auth/login", data=login_data)
-                if login_response.status_code == 200:
-                    token_data = login_response.json()
-                    self.token = token_data["access_token"]
-                    self.headers = {"Authorization": f"Bearer {self.token}"}
-                    return
-        assert register_response.status_code == 200
+        response = await aclient.get("/api/v1/users/me", headers=headers)
+        assert response.json()["full_name"] == "Updated Name"
 
-        login_data = {
-            "username": user_data["username"],
-            "password": user_data["password"],
-        }
+    async def test_update_user_me_taken_username(self, aclient):
+        """Тест: занятый username при обновлении дает 400"""
+        other_data, _ = await register_user(aclient)
+        _, headers = await register_user(aclient)
+
+        response = await aclient.put(
+            "/api/v1/users/me",
+            json={"username": other_data["username"]},
+            headers=headers,
+        )
+        assert response.status_code == 400
+
+    async def test_delete_user_me(self, aclient):
+        """Тест удаления пользователя: его задачи остаются без владельца"""
+        _, headers = await register_user(aclient)
+        task_ids = []
+        for i in range(2):
+            response = await aclient.post(
+                "/api/v1/tasks/", json={"title": f"Orphan {i}"}, headers=headers
+            )
+            task_ids.append(response.json()["id"])
+
+        response = await aclient.delete("/api/v1/users/me", headers=headers)
+        assert response.status_code == 200
+
+        # Токен удаленного пользователя больше не действует
+        response = await aclient.delete("/api/v1/users/me", headers=headers)
+        assert response.status_code == 401
+
+        async with TestingSessionLocal() as session:
+            result = await session.execute(
+                select(Task.id, Task.owner_id).where(Task.id.in_(task_ids))
+            )
+            assert sorted(result.all()) == [(task_id, None) for task_id in task_ids]
+
+    async def test_login_after_password_change(self, aclient):
+        """Тест: после смены пароля старый пароль не принимается"""
+        user_data, headers = await register_user(aclient)
+
+        response = await aclient.put(
+            "/api/v1/users/me", json={"password": "newpassword456"}, headers=headers
+        )
+        assert response.status_code == 200
+
+        assert (await login(aclient, user_data["username"])).status_code == 401
+        response = await login(aclient, user_data["username"], "newpassword456")
+        assert response.status_code == 200
+
+    async def test_login_sees_changes_from_other_workers(self, aclient):
+        """Тест: пароль, измененный в БД другим процессом, действует сразу"""
+        user_data, _ = await register_user(aclient)
+        new_hash = await password.get_password_hash("newpassword456")
+
+        # Изменение мимо сервиса, как из другого процесса
+        async with TestingSessionLocal() as session:
+            await session.execute(
+                update(User)
+                .where(User.username == user_data["username"])
+                .values(hashed_password=new_hash)
+            )
+            await session.commit()
+
+        assert (await login(aclient, user_data["username"])).status_code == 401
+        response = await login(aclient, user_data["username"], "newpassword456")
+        assert response.status_code == 200
+
+    async def test_login_after_deactivation(self, aclient):
+        """Тест: деактивированный пользователь не может войти"""
+        user_data, headers = await register_user(aclient)
+
+        response = await aclient.put(
+            "/api/v1/users/me", json={"is_active": False}, headers=headers
+        )
+        assert response.status_code == 200
+
+        assert (await login(aclient, user_data["username"])).status_code == 400
+
+    async def test_login_after_rename(self, aclient):
+        """Тест: старый username после переименования больше не входит"""
+        user_data, headers = await register_user(aclient)
+        new_username = f"renamed{uuid.uuid4().hex[:12]}"
+
+        response = await aclient.put(
+            "/api/v1/users/me", json={"username": new_username}, headers=headers
+        )
+        assert response.status_code == 200
+
+        assert (await login(aclient, user_data["username"])).status_code == 401
+        assert (await login(aclient, new_username)).status_code == 200
 
-        login_response = client.post("/api/v1/auth/login", data=login_data)
-        assert login_response.status_code == 200
+    async def test_login_after_delete(self, aclient):
+        """Тест: удаленный пользователь не может войти"""
+        user_data, headers = await register_user(aclient)
+
+        response = await aclient.delete("/api/v1/users/me", headers=headers)
+        assert response.status_code == 200
+
+        assert (await login(aclient, user_data["username"])).status_code == 401
 
-        token_data = login_response.json()
-        self.token = token_data["access_token"]
-        self.headers = {"Authorization": f"Bearer {self.token}"}
 
-    def test_create_task(self):
+class TestTasks:
+    """Тесты для работы с задачами"""
+
+    async def test_create_task(self, aclient, auth_headers):
         """Тест создания задачи"""
         task_data = {
             "title": "Test Task",
@@ -208,7 +369,9 @@ class TestTasks:
             "priority": "medium",
         }
 
-        response = client.post("/api/v1/tasks/", json=task_data, headers=self.headers)
+        response = await aclient.post(
+            "/api/v1/tasks/", json=task_data, headers=auth_headers
+        )
         assert response.status_code == 200
 
         data = response.json()
@@ -217,7 +380,7 @@ class TestTasks:
         assert "id" in data
         assert "created_at" in data
 
-    def test_get_tasks(self):
+    async def test_get_tasks(self, aclient, auth_headers):
         """Тест получения списка задач"""
         # Сначала создаем задачу
         task_data = {
@@ -225,61 +388,242 @@ class TestTasks:
             "description": "Task for testing list endpoint",
         }
 
-        create_response = client.post(
-            "/api/v1/tasks/", json=task_data, headers=self.headers
+        create_response = await aclient.post(
+            "/api/v1/tasks/", json=task_data, headers=auth_headers
         )
         assert create_response.status_code == 200
 
         # Получаем список задач
-        response = client.get("/api/v1/tasks/", headers=self.headers)
+        response = await aclient.get("/api/v1/tasks/", headers=auth_headers)
         assert response.status_code == 200
 
         data = response.json()
         assert isinstance(data, list)
         assert len(data) >= 1
 
-    def test_unauthorized_access(self):
-        """Тест доступа без авторизации"""
-        response = client.get("/api/v1/tasks/")
-        assert response.status_code == 403
+    async def test_get_tasks_before_id(self, aclient, auth_headers):
+        """Тест постраничного получения задач по курсору"""
+        for i in range(3):
+            response = await aclient.post(
+                "/api/v1/tasks/", json={"title": f"Page {i}"}, headers=auth_headers
+            )
+            assert response.status_code == 200
+
+        # Пользователь общий для тестов: свежие задачи идут первыми
+        response = await aclient.get("/api/v1/tasks/?limit=2", headers=auth_headers)
+        first = response.json()
+        assert [task["title"] for task in first] == ["Page 2", "Page 1"]
+
+        response = await aclient.get(
+            f"/api/v1/tasks/?limit=2&before_id={first[-1]['id']}", headers=auth_headers
+        )
+        assert response.status_code == 200
+        second = response.json()
+        assert second[0]["title"] == "Page 0"
+        assert {task["id"] for task in first}.isdisjoint(task["id"] for task in second)
+
+    async def test_get_tasks_foreign_before_id(self, aclient, auth_headers):
+        """Тест: курсор на чужую или несуществующую задачу дает 404"""
+        _, other_headers = await register_user(aclient)
+        response = await aclient.post(
+            "/api/v1/tasks/", json={"title": "Foreign cursor"}, headers=other_headers
+        )
+        foreign_id = response.json()["id"]
 
+        response = await aclient.get(
+            f"/api/v1/tasks/?before_id={foreign_id}", headers=auth_headers
+        )
+        assert response.status_code == 404
 
-class TestML:
-    """Тесты для ML эндпоинтов"""
+        response = await aclient.get(
+            "/api/v1/tasks/?before_id=999999", headers=auth_headers
+        )
+        assert response.status_code == 404
 
-    def setup_method(self):
-        """Подготовка для каждого теста"""
-        # Регистрируем пользователя и получаем токен
-        user_data = {
-            "email": "mluser@example.com",
-            "username": "mluser",
-            "password": "testpassword123",
+        # Курсор на свою первую задачу: пустая последняя страница, не ошибка
+        response = await aclient.get(
+            f"/api/v1/tasks/?before_id={foreign_id}", headers=other_headers
+        )
+        assert response.status_code == 200
+        assert response.json() == []
+
+    async def test_export_tasks(self, aclient, auth_headers):
+        """Тест потоковой выгрузки задач в NDJSON"""
+        for i in range(2):
+            response = await aclient.post(
+                "/api/v1/tasks/", json={"title": f"Export {i}"}, headers=auth_headers
+            )
+            assert response.status_code == 200
+
+        response = await aclient.get("/api/v1/tasks/export", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+
+        titles = [json.loads(line)["title"] for line in response.text.splitlines()]
+        assert [title for title in titles if title.startswith("Export")] == [
+            "Export 1",
+            "Export 0",
+        ]
+
+    async def test_update_task(self, aclient, auth_headers):
+        """Тест обновления задачи: завершение проставляет completed_at"""
+        response = await aclient.post(
+            "/api/v1/tasks/", json={"title": "Update me"}, headers=auth_headers
+        )
+        task = response.json()
+        assert task["completed_at"] is None
+
+        response = await aclient.put(
+            f"/api/v1/tasks/{task['id']}",
+            json={"title": "Updated", "status": "completed"},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["title"] == "Updated"
+        assert data["status"] == "completed"
+        assert data["is_completed"] is True
+        assert data["completed_at"] is not None
+
+        response = await aclient.post(
+            "/api/v1/tasks/", json={"title": "Complete me"}, headers=auth_headers
+        )
+        response = await aclient.put(
+            f"/api/v1/tasks/{response.json()['id']}",
+            json={"is_completed": True},
+            headers=auth_headers,
+        )
+        data = response.json()
+        assert data["status"] == "completed"
+        assert data["completed_at"] is not None
+
+    async def test_update_missing_or_foreign_task(self, aclient, auth_headers):
+        """Тест: обновление несуществующей или чужой задачи дает 404"""
+        response = await aclient.put(
+            "/api/v1/tasks/999999", json={"title": "Nope"}, headers=auth_headers
+        )
+        assert response.status_code == 404
+
+        _, other_headers = await register_user(aclient)
+        response = await aclient.post(
+            "/api/v1/tasks/", json={"title": "Foreign"}, headers=other_headers
+        )
+        task_id = response.json()["id"]
+
+        response = await aclient.put(
+            f"/api/v1/tasks/{task_id}", json={"title": "Stolen"}, headers=auth_headers
+        )
+        assert response.status_code == 404
+        response = await aclient.get(f"/api/v1/tasks/{task_id}", headers=other_headers)
+        assert response.json()["title"] == "Foreign"
+
+    async def test_delete_task(self, aclient, auth_headers):
+        """Тест удаления задачи: повторное удаление дает 404"""
+        response = await aclient.post(
+            "/api/v1/tasks/", json={"title": "Delete me"}, headers=auth_headers
+        )
+        task_id = response.json()["id"]
+
+        response = await aclient.delete(
+            f"/api/v1/tasks/{task_id}", headers=auth_headers
+        )
+        assert response.status_code == 200
+        response = await aclient.delete(
+            f"/api/v1/tasks/{task_id}", headers=auth_headers
+        )
+        assert response.status_code == 404
+        response = await aclient.get(f"/api/v1/tasks/{task_id}", headers=auth_headers)
+        assert response.status_code == 404
+
+    async def test_task_stats(self, aclient):
+        """Тест статистики задач по статусам"""
+        _, headers = await register_user(aclient)
+        task_ids = []
+        for task_data in [
+            {"title": "Stats 0"},
+            {"title": "Stats 1"},
+            {"title": "Stats 2", "status": "in_progress"},
+            {"title": "Stats 3", "status": "cancelled"},
+        ]:
+            response = await aclient.post(
+                "/api/v1/tasks/", json=task_data, headers=headers
+            )
+            task_ids.append(response.json()["id"])
+
+        response = await aclient.put(
+            f"/api/v1/tasks/{task_ids[0]}", json={"is_completed": True}, headers=headers
+        )
+        assert response.status_code == 200
+
+        response = await aclient.get("/api/v1/tasks/stats", headers=headers)
+        assert response.status_code == 200
+        assert response.json() == {
+            "total": 4,
+            "pending": 1,
+            "in_progress": 1,
+            "completed": 1,
+            "cancelled": 1,
         }
 
-        register_response = client.post("/api/v1/auth/register", json=user_data)
-        if register_response.status_code != 200:
-            print(f"ML Register response status: {register_response.status_code}")
-            print(f"ML Register response body: {register_response.text}")
+    async def test_openapi_bearer_scheme(self):
+        """Тест: Bearer схема описана в OpenAPI для защищенных эндпоинтов"""
+        schema = app.openapi()
 
-        login_data = {
-            "username": user_data["username"],
-            "password": user_data["password"],
+        assert schema["components"]["securitySchemes"]["HTTPBearer"] == {
+            "type": "http",
+            "scheme": "bearer",
         }
+        assert schema["paths"]["/api/v1/tasks/"]["get"]["security"] == [
+            {"HTTPBearer": []}
+        ]
 
-        login_response = client.post("/api/v1/auth/login", data=login_data)
-        if login_response.status_code != 200:
-            print(f"ML Login response status: {login_response.status_code}")
-            print(f"ML Login response body: {login_response.text}")
-        token_data = login_response.json()
-        self.token = token_data["access_token"]
-        self.headers = {"Authorization": f"Bearer {self.token}"}
+    async def test_unauthorized_access(self, aclient):
+        """Тест доступа без авторизации"""
+        response = await aclient.get("/api/v1/tasks/")
+        assert response.status_code == 401
+
+
+class TestML:
+    """Тесты для ML эндпоинтов"""
 
-    def test_ml_info(self):
+    async def test_ml_info(self, aclient, auth_headers):
         """Тест информации о ML алгоритмах"""
-        response = client.get("/api/v1/ml/", headers=self.headers)
+        response = await aclient.get("/api/v1/ml/", headers=auth_headers)
         assert response.status_code == 200
 
         data = response.json()
         assert "available_algorithms" in data
         assert "version" in data
         assert len(data["available_algorithms"]) >= 3
+
+    async def test_upload_data(self, aclient, auth_headers):
+        """Тест загрузки CSV: размер, типы столбцов, превью и статистика"""
+        csv_data = b"id,score,name\n1,0.5,alpha\n2,1.5,beta\n3,2.5,gamma\n"
+
+        response = await aclient.post(
+            "/api/v1/ml/upload-data",
+            files={"file": ("data.csv", csv_data, "text/csv")},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["shape"] == [3, 3]
+        assert data["columns"] == ["id", "score", "name"]
+        assert data["dtypes"] == {"id": "int64", "score": "double", "name": "string"}
+        assert data["preview"][0] == {"id": 1, "score": 0.5, "name": "alpha"}
+        assert data["stats"] == {
+            "id": {"mean": 2.0, "min": 1, "max": 3},
+            "score": {"mean": 1.5, "min": 0.5, "max": 2.5},
+        }
+
+    async def test_upload_malformed_csv(self, aclient, auth_headers):
+        """Тест: CSV с неверным числом полей в строке дает 400"""
+        csv_data = b"a,b\n1,2\n3,4,5\n"
+
+        response = await aclient.post(
+            "/api/v1/ml/upload-data",
+            files={"file": ("broken.csv", csv_data, "text/csv")},
+            headers=auth_headers,
+        )
+        assert response.status_code == 400
@@ -0,0 +1,186 @@
+"""
+Тесты аутентификации: кеши проверок и ограничения паролей
+"""
+
+import functools
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+import jwt
+import pytest
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from backend.app.auth import password, security
+from backend.app.schemas.user import (
+    PASSWORD_MAX_BYTES,
+    UserCreate,
+    UserUpdate,
+    check_password_bytes,
+)
+
+
+@pytest.fixture
+def password_cache(monkeypatch):
+    """Пустой кеш проверок паролей и дешевый bcrypt"""
+    cache: OrderedDict = OrderedDict()
+    monkeypatch.setattr(password, "_verified_cache", cache)
+    monkeypatch.setattr(password, "BCRYPT_ROUNDS", 4)
+    return cache
+
+
+@pytest.fixture
+def token_cache(monkeypatch):
+    """Пустой кеш декодированных токенов"""
+    cache: OrderedDict = OrderedDict()
+    monkeypatch.setattr(security, "_token_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    """Счетчик проверок подписи JWT"""
+    calls = []
+    decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(security.jwt, "decode", counting_decode)
+    return calls
+
+
+@pytest.fixture
+def bcrypt_calls(monkeypatch):
+    """Счетчик вызовов bcrypt при проверке пароля"""
+    calls = []
+    check = password._bcrypt_check
+
+    def counting_check(plain_password, hashed_password):
+        calls.append(plain_password)
+        return check(plain_password, hashed_password)
+
+    monkeypatch.setattr(password, "_bcrypt_check", counting_check)
+    return calls
+
+
+class TestPasswordCache:
+    """Тесты кеша успешных проверок паролей"""
+
+    async def test_cache_hit(self, password_cache, bcrypt_calls):
+        """Тест: повторная проверка верного пароля не вызывает bcrypt"""
+        hashed = password._bcrypt_hash("correct-password")
+
+        assert await password.verify_password("correct-password", hashed)
+        assert await password.verify_password("correct-password", hashed)
+
+        assert bcrypt_calls == ["correct-password"]
+        assert list(password_cache) == [hashed]
+        # В кеше HMAC пароля, а не сам пароль
+        assert b"correct-password" not in password_cache[hashed]
+
+    async def test_wrong_password_after_cached_success(
+        self, password_cache, bcrypt_calls
+    ):
+        """Тест: неверный пароль после закешированного успеха отклоняется"""
+        hashed = password._bcrypt_hash("correct-password")
+        assert await password.verify_password("correct-password", hashed)
+
+        assert not await password.verify_password("wrong-password", hashed)
+        assert bcrypt_calls == ["correct-password", "wrong-password"]
+        # Неудачная попытка не вытесняет и не портит запись
+        assert await password.verify_password("correct-password", hashed)
+        assert len(bcrypt_calls) == 2
+
+    async def test_failed_check_not_cached(self, password_cache):
+        """Тест: неудачные проверки не попадают в кеш"""
+        hashed = password._bcrypt_hash("correct-password")
+
+        assert not await password.verify_password("wrong-password", hashed)
+        assert not password_cache
+
+    async def test_eviction(self, password_cache, monkeypatch):
+        """Тест: при переполнении вытесняется давно не использованный хеш"""
+        monkeypatch.setattr(password, "PASSWORD_CACHE_SIZE", 2)
+        hashes = [password._bcrypt_hash(f"password-{i}") for i in range(3)]
+
+        assert await password.verify_password("password-0", hashes[0])
+        assert await password.verify_password("password-1", hashes[1])
+        # Обращение к первому хешу делает вытесняемым второй
+        assert await password.verify_password("password-0", hashes[0])
+        assert await password.verify_password("password-2", hashes[2])
+
+        assert list(password_cache) == [hashes[0], hashes[2]]
+
+
+class TestTokenCache:
+    """Тесты кеша декодированных JWT"""
+
+    async def test_cache_hit(self, token_cache, decode_calls):
+        """Тест: повторная проверка токена не декодирует его заново"""
+        token = security.create_access_token({"sub": "alice", "user_id": 1})
+
+        first = await security.verify_token(token)
+        second = await security.verify_token(token)
+
+        assert first.username == second.username == "alice"
+        assert second.user_id == 1
+        assert decode_calls == [token]
+        assert len(token_cache) == 1
+
+    async def test_expired_after_cached(self, token_cache, decode_calls, monkeypatch):
+        """Тест: закешированный токен отклоняется после истечения exp"""
+        token = security.create_access_token(
+            {"sub": "alice", "user_id": 1}, expires_delta=timedelta(seconds=60)
+        )
+        assert (await security.verify_token(token)).username == "alice"
+
+        # Часы сдвигаются за exp: для кеша через time.time, для PyJWT через
+        # отрицательный leeway (он читает время через datetime)
+        now = time.time() + 120
+        monkeypatch.setattr(security.time, "time", lambda: now)
+        monkeypatch.setattr(
+            security.jwt, "decode", functools.partial(security.jwt.decode, leeway=-120)
+        )
+
+        with pytest.raises(HTTPException) as exc_info:
+            await security.verify_token(token)
+        assert exc_info.value.status_code == 401
+        # Запись из кеша не использована и удалена
+        assert decode_calls == [token, token]
+        assert not token_cache
+
+
+class TestPasswordBytes:
+    """Тесты ограничения bcrypt в 72 байта"""
+
+    @pytest.mark.parametrize(
+        "value",
+        ["a" * 72, "é" * 36, "€" * 24, "😀" * 18, None],
+    )
+    def test_within_limit(self, value):
+        """Тест: пароли до 72 байт в UTF-8 принимаются"""
+        assert check_password_bytes(value) == value
+
+    @pytest.mark.parametrize("value", ["a" * 73, "é" * 37, "€" * 25, "😀" * 19])
+    def test_over_limit(self, value):
+        """Тест: не более 72 символов, но больше 72 байт - отказ"""
+        assert len(value.encode("utf-8")) > PASSWORD_MAX_BYTES
+
+        with pytest.raises(ValueError, match="72 байт"):
+            check_password_bytes(value)
+
+    def test_schemas(self):
+        """Тест: ограничение действует в схемах создания и обновления"""
+        password_value = "é" * 40
+        assert len(password_value) <= PASSWORD_MAX_BYTES
+
+        with pytest.raises(ValidationError):
+            UserCreate(
+                email="bytes@example.com", username="bytes", password=password_value
+            )
+        with pytest.raises(ValidationError):
+            UserUpdate(password=password_value)
+        assert UserUpdate(password="é" * 36).password == "é" * 36
@@ -0,0 +1,146 @@
+"""
+Тесты для дерева решений
+"""
+
+import numpy as np
+import pytest
+from sklearn.datasets import load_iris, make_classification
+from sklearn.tree import DecisionTreeClassifier
+
+from ml_core import decision_tree as decision_tree_module
+from ml_core.decision_tree import DecisionTree, FeatureBinner
+
+
+class TestDecisionTree:
+    """Тестовый класс для дерева решений"""
+
+    def setup_method(self):
+        """Подготовка тестовых данных"""
+        self.X, self.y = make_classification(
+            n_samples=300,
+            n_features=6,
+            n_informative=4,
+            n_classes=3,
+            random_state=42,
+        )
+
+    def test_decision_tree_initialization(self):
+        """Тест инициализации дерева решений"""
+        tree = DecisionTree(max_depth=5, min_samples_split=4, random_state=42)
+
+        assert tree.max_depth == 5
+        assert tree.min_samples_split == 4
+        assert tree.random_state == 42
+        assert tree.root is None
+
+    def test_decision_tree_fit_predict(self):
+        """Тест обучения и предсказания"""
+        tree = DecisionTree(max_depth=5, random_state=42)
+        tree.fit(self.X, self.y)
+
+        predictions = tree.predict(self.X)
+        assert predictions.shape == (300,)
+        assert np.isin(predictions, self.y).all()
+        assert tree.score(self.X, self.y) > 0.8
+
+    def test_criteria(self):
+        """Тест критериев разделения"""
+        for criterion in ["gini", "entropy"]:
+            tree = DecisionTree(max_depth=5, criterion=criterion)
+            assert tree.fit(self.X, self.y).score(self.X, self.y) > 0.8
+
+        with pytest.raises(ValueError, match="Неизвестный критерий"):
+            DecisionTree(criterion="mse")
+
+    def test_histogram_split(self):
+        """Тест приближенного поиска разделений по гистограммам"""
+        exact = DecisionTree(max_depth=5).fit(self.X, self.y)
+        binned = DecisionTree(max_depth=5, max_bins=32).fit(self.X, self.y)
+
+        assert binned.binner_ is not None
+        assert abs(binned.score(self.X, self.y) - exact.score(self.X, self.y)) < 0.1
+
+    def test_histogram_paths_match(self, monkeypatch):
+        """Тест: гистограммы больших и малых узлов совпадают"""
+        X, y = make_classification(
+            n_samples=20000,
+            n_features=8,
+            n_informative=5,
+            n_classes=3,
+            random_state=42,
+        )
+        tree = DecisionTree(max_depth=1, max_bins=255).fit(X, y)
+        X_binned = tree.binner_.transform(X)
+        rows = np.arange(len(X))
+        # Коды корзин доходят до 254: произведение на число классов > 255
+        assert X_binned.max() == 254
+        assert len(rows) * X.shape[1] > decision_tree_module.SPLIT_BLOCK_SIZE
+
+        large = tree._histogram(X_binned, y, rows)
+        monkeypatch.setattr(decision_tree_module, "SPLIT_BLOCK_SIZE", 1 << 30)
+        small = tree._histogram(X_binned, y, rows)
+
+        assert np.array_equal(large, small)
+        assert np.all(large.sum(axis=(1, 2)) == len(rows))
+
+    def test_feature_binner(self):
+        """Тест разбиения признаков на корзины"""
+        X = np.array([[1.0, 5.0], [2.0, 5.0], [2.0, 5.0], [3.0, 5.0]])
+        binner = FeatureBinner(max_bins=16).fit(X)
+        X_binned = binner.transform(X)
+
+        assert X_binned.dtype == np.uint8
+        assert X_binned[:, 0].tolist() == [0, 1, 1, 2]
+        assert X_binned[:, 1].tolist() == [0, 0, 0, 0]
+        # Корзина <= t эквивалентна x <= edges[t]
+        for t, edge in enumerate(binner.bin_edges_[0]):
+            assert np.array_equal(X_binned[:, 0] <= t, X[:, 0] <= edge)
+
+        many = np.arange(1000, dtype=float).reshape(-1, 1)
+        assert FeatureBinner(max_bins=8).fit(many).transform(many).max() <= 7
+
+    def test_fit_indices(self):
+        """Тест обучения по индексам строк и признаков без копирования"""
+        rows = np.random.RandomState(0).choice(300, 300, replace=True)
+        features = np.array([4, 1, 3])
+
+        tree = DecisionTree(max_depth=4).fit(self.X, self.y, rows, features)
+        copied = DecisionTree(max_depth=4).fit(self.X[rows][:, features], self.y[rows])
+
+        # Узлы хранят номера столбцов исходной X
+        used = tree.nodes_["feature"][tree.nodes_["feature"] >= 0]
+        assert np.isin(used, features).all()
+        assert np.array_equal(tree.predict(self.X), copied.predict(self.X[:, features]))
+
+    def test_predict_without_fit(self):
+        """Тест предсказания без обучения"""
+        tree = DecisionTree()
+
+        with pytest.raises(ValueError, match="Модель не обучена"):
+            tree.predict(self.X)
+
+    def test_pure_node_is_leaf(self):
+        """Тест: выборка одного класса дает лист"""
+        y = np.ones(len(self.X), dtype=int)
+        tree = DecisionTree().fit(self.X, y)
+
+        assert tree.root is not None
+        assert tree.root.value == 1
+        assert np.all(tree.predict(self.X) == 1)
+
+    def test_iris_accuracy(self):
+        """Тест точности на iris"""
+        X, y = load_iris(return_X_y=True)
+
+        tree = DecisionTree(max_depth=4).fit(X, y)
+        assert tree.score(X, y) > 0.95
+
+    def test_comparison_with_sklearn(self):
+        """Сравнение точности с sklearn (приблизительное)"""
+        our_tree = DecisionTree(max_depth=5, random_state=42).fit(self.X, self.y)
+        sklearn_tree = DecisionTreeClassifier(max_depth=5, random_state=42)
+        sklearn_tree.fit(self.X, self.y)
+
+        our_accuracy = our_tree.score(self.X, self.y)
+        sklearn_accuracy = sklearn_tree.score(self.X, self.y)
+        assert abs(our_accuracy - sklearn_accuracy) < 0.1
@@ -4,20 +4,24 @@
 
 import numpy as np
 import pytest
-from sklearn.cluster import KMeans as SklearnKMeans
-from sklearn.datasets import make_blobs
 
+from ml_core import kmeans as kmeans_module
 from ml_core.kmeans import KMeans
 
 
+@pytest.fixture(scope="module")
+def fitted_kmeans(blobs):
+    """Модель, обученная на blobs: одна на модуль для тестов, которые ее только читают"""
+    return KMeans(n_clusters=4, random_state=42).fit(blobs[0])
+
+
 class TestKMeans:
     """Тестовый класс для K-Means"""
 
-    def setup_method(self):
+    @pytest.fixture(autouse=True)
+    def setup_data(self, blobs):
         """Подготовка тестовых данных"""
-        self.X, self.y_true = make_blobs(
-            n_samples=300, centers=4, n_features=2, random_state=42, cluster_std=1.5
-        )
+        self.X, self.y_true = blobs
 
     def test_kmeans_initialization(self):
         """Тест инициализации K-Means"""
@@ -29,10 +33,9 @@ class TestKMeans:
         assert kmeans.centroids is None
         assert kmeans.labels is None
 
-    def test_kmeans_fit(self):
+    def test_kmeans_fit(self, fitted_kmeans):
         """Тест обучения K-Means"""
-        kmeans = KMeans(n_clusters=4, random_state=42)
-        kmeans.fit(self.X)
+        kmeans = fitted_kmeans
 
         assert kmeans.centroids is not None
         assert kmeans.labels is not None
@@ -40,15 +43,14 @@ class TestKMeans:
         assert kmeans.labels.shape == (300,)
         assert kmeans.inertia is not None
 
-    def test_kmeans_predict(self):
+    def test_kmeans_predict(self, fitted_kmeans):
         """Тест предсказания K-Means"""
-        kmeans = KMeans(n_clusters=4, random_state=42)
-        kmeans.fit(self.X)
+        kmeans = fitted_kmeans
 
         # Тест на тех же данных
         predictions = kmeans.predict(self.X)
         assert predictions.shape == (300,)
-        assert set(predictions) <= set(range(4))
+        assert np.all((predictions >= 0) & (predictions < 4))
 
         # Тест на новых данных
         new_data = np.array([[0, 0], [10, 10]])
@@ -61,9 +63,97 @@ class TestKMeans:
         labels = kmeans.fit_predict(self.X)
 
         assert labels.shape == (300,)
-        assert set(labels) <= set(range(4))
+        assert np.all((labels >= 0) & (labels < 4))
         assert np.array_equal(labels, kmeans.labels)
 
+    def test_calculate_distance(self):
+        """Тест квадратов расстояний до центроидов"""
+        kmeans = KMeans(n_clusters=4)
+        centroids = self.X[:4]
+
+        distances = kmeans._calculate_distance(self.X, centroids)
+        expected = ((self.X[:, np.newaxis, :] - centroids) ** 2).sum(axis=2)
+
+        assert distances.shape == (300, 4)
+        assert np.allclose(distances, expected)
+        assert np.all(distances >= 0)
+
+    def test_lloyd_step(self, monkeypatch):
+        """Тест шага Ллойда (назначение кластеров и пересчет центроидов)"""
+        kmeans = KMeans(n_clusters=3)
+        X = np.array([[0.0, 0.0], [2.0, 2.0], [10.0, 10.0]])
+        previous = np.array([[1.0, 1.0], [9.0, 9.0], [50.0, 50.0]])
+
+        labels, centroids = kmeans._lloyd_step(X, previous)
+
+        assert labels.tolist() == [0, 0, 1]
+        # Пустой кластер 2 остается на месте
+        assert np.allclose(centroids, [[1.0, 1.0], [10.0, 10.0], [50.0, 50.0]])
+        assert kmeans._calculate_inertia(X, labels, centroids) == 4.0
+
+        # Результат не зависит от разбиения на блоки
+        monkeypatch.setattr(kmeans_module, "ASSIGN_BLOCK_SIZE", 64)
+        block_labels, block_centroids = KMeans(n_clusters=4)._lloyd_step(
+            self.X, self.X[:4]
+        )
+        distances = KMeans(n_clusters=4)._calculate_distance(self.X, self.X[:4])
+        assert np.array_equal(block_labels, distances.argmin(axis=1))
+        for k in range(4):
+            assert np.allclose(
+                block_centroids[k], self.X[block_labels == k].mean(axis=0)
+            )
+
+    def test_kmeans_plus_plus_init(self):
+        """Тест инициализации k-means++"""
+        kmeans = KMeans(n_clusters=4, random_state=42)
+        centroids = kmeans._initialize_centroids(self.X)
+
+        assert centroids.shape == (4, 2)
+        # Центроиды выбираются среди точек и не повторяются
+        assert all(any(np.array_equal(c, x) for x in self.X) for c in centroids)
+        assert len(np.unique(centroids, axis=0)) == 4
+
+        random_init = KMeans(n_clusters=4, random_state=42, init="random")
+        assert random_init.fit(self.X).inertia is not None
+
+        with pytest.raises(ValueError, match="Неизвестный способ инициализации"):
+            KMeans(init="farthest")
+
+    def test_elkan_matches_lloyd(self):
+        """Тест: алгоритм elkan дает тот же результат, что и lloyd"""
+        rng = np.random.RandomState(0)
+        centers = rng.uniform(-10, 10, size=(12, 5))
+        X = centers[rng.randint(12, size=2000)] + rng.normal(size=(2000, 5))
+        lloyd = KMeans(n_clusters=12, random_state=42, max_iters=300).fit(X)
+        elkan = KMeans(
+            n_clusters=12, random_state=42, max_iters=300, algorithm="elkan"
+        ).fit(X)
+
+        assert np.array_equal(lloyd.labels, elkan.labels)
+        assert np.allclose(lloyd.centroids, elkan.centroids)
+        assert np.isclose(lloyd.inertia, elkan.inertia)
+
+        single = KMeans(n_clusters=1, algorithm="elkan").fit(self.X)
+        assert np.allclose(single.centroids[0], self.X.mean(axis=0))
+
+        with pytest.raises(ValueError, match="Неизвестный алгоритм"):
+            KMeans(algorithm="full")
+
+    def test_dtype(self, fitted_kmeans):
+        """Тест типа данных расчетов"""
+        kmeans32 = fitted_kmeans
+        kmeans64 = KMeans(n_clusters=4, random_state=42, dtype=np.float64).fit(self.X)
+
+        assert kmeans32.centroids.dtype == np.float32
+        assert kmeans64.centroids.dtype == np.float64
+        assert np.array_equal(kmeans32.labels, kmeans64.labels)
+        assert np.isclose(kmeans32.inertia, kmeans64.inertia)
+
+        # Большое смещение данных не портит расчеты во float32
+        shifted = KMeans(n_clusters=4, random_state=42).fit(self.X + 1e5)
+        assert np.array_equal(shifted.labels, kmeans64.labels)
+        assert np.array_equal(shifted.predict(self.X + 1e5), kmeans64.labels)
+
     def test_predict_without_fit(self):
         """Тест предсказания без обучения"""
         kmeans = KMeans(n_clusters=4)
@@ -71,14 +161,13 @@ class TestKMeans:
         with pytest.raises(ValueError, match="Модель не обучена"):
             kmeans.predict(self.X)
 
-    def test_different_n_clusters(self):
+    @pytest.mark.parametrize("n_clusters", [2, 3, 5])
+    def test_different_n_clusters(self, n_clusters):
         """Тест с разным количеством кластеров"""
-        for n_clusters in [2, 3, 5]:
-            kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-            labels = kmeans.fit_predict(self.X)
+        kmeans = KMeans(n_clusters=n_clusters, random_state=42)
+        labels = kmeans.fit_predict(self.X)
 
-            unique_labels = set(labels)
-            assert len(unique_labels) <= n_clusters
+        assert np.unique(labels).size <= n_clusters
 
     def test_reproducibility(self):
         """Тест воспроизводимости результатов"""
@@ -93,6 +182,8 @@ class TestKMeans:
 
     def test_comparison_with_sklearn(self):
         """Сравнение результатов с sklearn (приблизительное)"""
+        from sklearn.cluster import KMeans as SklearnKMeans
+
         # Наш алгоритм
         our_kmeans = KMeans(n_clusters=4, random_state=42, max_iters=300)
         our_labels = our_kmeans.fit_predict(self.X)
@@ -106,4 +197,4 @@ class TestKMeans:
         assert sklearn_kmeans.inertia_ > 0
 
         # Проверяем количество уникальных кластеров
-        assert len(set(our_labels)) == len(set(sklearn_labels)) == 4
+        assert np.unique(our_labels).size == np.unique(sklearn_labels).size == 4
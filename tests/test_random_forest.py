@@ -0,0 +1,86 @@
+"""
+Тесты для случайного леса
+"""
+
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+
+from ml_core.random_forest import RandomForest
+
+
+class TestRandomForest:
+    """Тестовый класс для случайного леса"""
+
+    def setup_method(self):
+        """Подготовка тестовых данных"""
+        self.X, self.y = make_classification(
+            n_samples=300,
+            n_features=8,
+            n_informative=5,
+            n_classes=3,
+            random_state=42,
+        )
+
+    def test_random_forest_fit_predict(self):
+        """Тест обучения и предсказания"""
+        rf = RandomForest(n_estimators=10, max_depth=5, random_state=42)
+        rf.fit(self.X, self.y)
+
+        assert len(rf.trees) == 10
+        assert len(rf.feature_indices) == 10
+
+        predictions = rf.predict(self.X)
+        assert predictions.shape == (300,)
+        assert np.isin(predictions, self.y).all()
+        assert rf.score(self.X, self.y) > 0.8
+
+    def test_predict_without_fit(self):
+        """Тест предсказания без обучения"""
+        rf = RandomForest(n_estimators=5)
+
+        with pytest.raises(ValueError, match="Модель не обучена"):
+            rf.predict(self.X)
+
+    def test_n_jobs_reproducibility(self):
+        """Тест: результат не зависит от числа потоков"""
+        sequential = RandomForest(n_estimators=8, max_depth=4, random_state=42)
+        threaded = RandomForest(n_estimators=8, max_depth=4, random_state=42, n_jobs=4)
+
+        sequential.fit(self.X, self.y)
+        threaded.fit(self.X, self.y)
+
+        for a, b in zip(sequential.feature_indices, threaded.feature_indices):
+            assert np.array_equal(a, b)
+        assert np.array_equal(sequential.predict(self.X), threaded.predict(self.X))
+
+    def test_histogram_forest(self):
+        """Тест леса с общим разбиением на корзины"""
+        exact = RandomForest(n_estimators=10, max_depth=5, random_state=42)
+        binned = RandomForest(
+            n_estimators=10, max_depth=5, random_state=42, max_bins=255
+        )
+        exact.fit(self.X, self.y)
+        binned.fit(self.X, self.y)
+
+        assert all(tree.binner_ is binned.trees[0].binner_ for tree in binned.trees)
+        assert abs(binned.score(self.X, self.y) - exact.score(self.X, self.y)) < 0.05
+
+    def test_fused_traversal_matches_trees(self):
+        """Тест: совместный обход леса совпадает с голосованием деревьев"""
+        rf = RandomForest(n_estimators=7, max_depth=6, random_state=42)
+        rf.fit(self.X, self.y)
+
+        _, counts = rf._vote_counts(self.X)
+        for class_index, label in enumerate(rf.classes_):
+            votes = sum(tree.predict(self.X) == label for tree in rf.trees)
+            assert np.array_equal(counts[:, class_index], votes)
+
+    def test_predict_proba(self):
+        """Тест вероятностей классов"""
+        rf = RandomForest(n_estimators=10, max_depth=4, random_state=42)
+        rf.fit(self.X, self.y)
+
+        probabilities = rf.predict_proba(self.X)
+        assert probabilities.shape == (300, 3)
+        assert np.allclose(probabilities.sum(axis=1), 1.0)